@@ -0,0 +1,249 @@
+import argparse, json, os, platform, random, sys, time, tracemalloc
+import numpy as np
+
+# Offline micro-benchmarks for every game engine: python benchmark.py --save baseline.json
+# then later python benchmark.py --compare baseline.json. Workloads are fixed and seeded, so
+# node counts are deterministic: any change in them is reported, and wall time is flagged when
+# it grows by more than --threshold. Wall time is the best of up to MAX_REPEATS untraced runs
+# (repeats stop once MIN_TOTAL seconds are spent); peak memory comes from one more run under
+# tracemalloc.
+
+SEED = 2024
+MAX_REPEATS = 10
+MIN_TOTAL = 1.0
+CRYPT_UNSOLVABLE = [("AB", "CD", "EFGH"), ("SEND", "MORE", "MONEYS"), ("FOUR", "FIVE", "NINETEEN"),
+                    ("EVEN", "EVEN", "ODD"), ("ABC", "ABC", "ABC")]
+EVOLVER_SIZES = [(100, 20), (100, 100), (1000, 20), (1000, 100), (10000, 100)]
+
+
+def reachable_positions():
+    # Every non-terminal 3x3 position with O to move in a game X opened.
+    from tic_tac_toe import is_draw, is_winner
+    seen, frontier = set(), [(' ' * 9, 'X')]
+    positions = []
+    while frontier:
+        board, player = frontier.pop()
+        for i, cell in enumerate(board):
+            if cell != ' ':
+                continue
+            child = board[:i] + player + board[i + 1:]
+            if child in seen or is_winner(child, player) or is_draw(child):
+                continue
+            seen.add(child)
+            if player == 'X':
+                positions.append(child)
+            frontier.append((child, 'O' if player == 'X' else 'X'))
+    return sorted(positions)
+
+
+def bench_tic_tac_toe_table(quick):
+    from tic_tac_toe import best_move, solution_table
+    solution_table()
+    positions = reachable_positions()
+
+    def run():
+        for board in positions:
+            best_move(list(board), 'hard')
+        return {"ops": len(positions)}
+    return run
+
+
+def bench_tic_tac_toe_search(quick):
+    # A fresh engine per run: the transposition table and history would otherwise carry over
+    # between repeats and make node counts depend on the repeat count.
+    from tic_tac_toe.engine import Engine, from_cells
+    positions = reachable_positions()[::8 if quick else 1]
+
+    def run():
+        engine = Engine(3, 3)
+        nodes = 0
+        for board in positions:
+            x_bits, o_bits = from_cells(list(board))
+            nodes += engine.search(x_bits, o_bits, 'O')["nodes"]
+        return {"ops": len(positions), "nodes": nodes}
+    return run
+
+
+def stratified_boards(per_depth):
+    from eight_puzzle import distance_table, goal_state
+    from eight_puzzle.distance_table import rank
+    distances = distance_table()
+    rng = random.Random(SEED)
+    buckets = {}
+    while len(buckets) < 8 or min(len(b) for b in buckets.values()) < per_depth:
+        state = goal_state.copy()
+        rng.shuffle(state)
+        depth = distances[rank(state)]
+        if depth == 255:
+            continue
+        bucket = buckets.setdefault(min(depth // 4, 7), [])
+        if len(bucket) < per_depth:
+            bucket.append(state)
+    return [s for depth in sorted(buckets) for s in buckets[depth]]
+
+
+def bench_eight_puzzle(quick):
+    from eight_puzzle import a_star
+    boards = stratified_boards(1 if quick else 3)
+
+    def run():
+        nodes = peak = 0
+        for board in boards:
+            stats = {}
+            a_star(board, stats)
+            nodes += stats["nodes_expanded"]
+            peak = max(peak, stats["peak_open"])
+        return {"ops": len(boards), "nodes": nodes, "peak_open": peak}
+    return run
+
+
+def bench_crypt(quick):
+    # The solver behind solve_crypt, called directly so the solution cache cannot short-circuit it.
+    from crypt_arithmetic import PUZZLES
+    from crypt_arithmetic import solver
+    puzzles = [p for level in PUZZLES.values() for p in level] + CRYPT_UNSOLVABLE
+
+    def run():
+        nodes = solvable = 0
+        for word1, word2, result in puzzles:
+            stats = {}
+            solvable += bool(solver.solve([word1, word2], result, 1, stats))
+            nodes += stats["nodes"]
+        return {"ops": len(puzzles), "nodes": nodes, "solvable": solvable}
+    return run
+
+
+def bench_evolver(size, length):
+    def make(quick):
+        from word_evolver import encode, evolve_population, generation_rng, random_population
+        target = ("THE QUICK BROWN FOX JUMPS OVER THE LAZY DOG " * 3)[:length]
+        target_codes = encode([target])[0]
+        start = random_population(generation_rng(SEED, 0), size, length)
+        generations = 10 if quick else 50
+
+        def run():
+            population, scores = start, None
+            for generation in range(1, generations + 1):
+                population, scores = evolve_population(population, target_codes, {}, generation_rng(SEED, generation),
+                                                       scores, log_limit=0)
+            return {"ops": generations, "fitness_evaluations": generations * size, "best": int(scores.max())}
+        return run
+    return make
+
+
+def bench_personality(quick):
+    from personality_evaluator import get_model
+    from personality_evaluator.model import score_rows
+    rng = np.random.default_rng(SEED)
+    answers = rng.integers(0, 2, (20000 if quick else 100000, 20))
+    model = get_model()
+
+    def run():
+        score_rows(model, answers)
+        return {"ops": len(answers)}
+    return run
+
+
+def bench_personality_table(quick):
+    from personality_evaluator import get_table
+    rng = np.random.default_rng(SEED)
+    rows = rng.integers(0, 2, (5000 if quick else 20000, 20)).tolist()
+    table = get_table()
+
+    def run():
+        for row in rows:
+            table.lookup(row)
+        return {"ops": len(rows)}
+    return run
+
+
+BENCHMARKS = {
+    "tic_tac_toe.best_move": bench_tic_tac_toe_table,
+    "tic_tac_toe.search": bench_tic_tac_toe_search,
+    "eight_puzzle.a_star": bench_eight_puzzle,
+    "crypt_arithmetic.solve": bench_crypt,
+    **{f"word_evolver.generations[{size}x{length}]": bench_evolver(size, length) for size, length in EVOLVER_SIZES},
+    "personality_evaluator.score_rows": bench_personality,
+    "personality_evaluator.table_lookup": bench_personality_table,
+}
+
+
+def measure(make, quick, memory):
+    run = make(quick)
+    walls = []
+    while len(walls) < MAX_REPEATS and sum(walls) < MIN_TOTAL:
+        start = time.perf_counter()
+        result = run()
+        walls.append(time.perf_counter() - start)
+    wall = min(walls)
+    result = dict(result, wall_s=round(wall, 4), ops_per_sec=round(result["ops"] / wall, 1) if wall else None)
+    if memory:
+        tracemalloc.start()
+        run()
+        result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, threshold):
+    # Wall time may drift with the machine; anything else that changes is deterministic.
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if base["wall_s"] and result["wall_s"] > base["wall_s"] * (1 + threshold):
+            regressions.append(f"{name}: wall {base['wall_s']}s -> {result['wall_s']}s")
+        if base.get("peak_kib") and result.get("peak_kib", 0) > base["peak_kib"] * (1 + threshold):
+            regressions.append(f"{name}: peak memory {base['peak_kib']} KiB -> {result['peak_kib']} KiB")
+        for key in ("nodes", "peak_open", "solvable", "best"):
+            if key in base and result.get(key) != base[key]:
+                regressions.append(f"{name}: {key} {base[key]} -> {result.get(key)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game engines.")
+    parser.add_argument("--only", nargs="*", help="benchmark name prefixes to run")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["quick"] != args.quick:
+            parser.error("the baseline was recorded with a different --quick setting")
+
+    results = {}
+    for name, make in BENCHMARKS.items():
+        if args.only and not any(name.startswith(prefix) for prefix in args.only):
+            continue
+        results[name] = measure(make, args.quick, not args.no_memory)
+        r = results[name]
+        extra = "".join(f" {k}={r[k]}" for k in ("nodes", "peak_open") if k in r)
+        memory = f" peak={r['peak_kib']}KiB" if "peak_kib" in r else ""
+        print(f"{name:45} {r['wall_s']:8.3f}s {r['ops_per_sec']:>12} ops/s{memory}{extra}")
+
+    report = {"meta": {"python": platform.python_version(), "numpy": np.__version__,
+                       "machine": platform.machine(), "cpus": os.cpu_count(), "quick": args.quick,
+                       "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())},
+              "benchmarks": results}
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if baseline:
+        regressions = compare(results, baseline["benchmarks"], args.threshold)
+        for line in regressions:
+            print("REGRESSION", line)
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,9 @@
 from flask import Blueprint, request, jsonify, render_template
-import random
+import os, random, time
+import game_state, metrics, solver_pool
+from . import vectorized
+from .solution_cache import SolutionCache, canonicalize, encode, decode
+from .catalogue import Catalogue
 
 crypt_arithmetic = Blueprint('crypt_arithmetic', __name__, template_folder='templates')
 
@@ -27,54 +31,137 @@ PUZZLES = {
     ]
 }
 
-puzzle_index = {"easy": 0, "medium": 0, "hard": 0}
-current_puzzle = {}
-
-
-def solve_crypt(word1, word2, result):
-    letters = sorted(set(word1 + word2 + result))
-    if len(letters) > 10:
-        return None
-
-    first_letters = {word1[0], word2[0], result[0]}
-    domains = {l: set(range(10)) for l in letters}
-    for fl in first_letters:
-        domains[fl].discard(0)
-
-    def is_valid(assignment):
-        if len(set(assignment.values())) < len(assignment):
-            return False
-        if len(assignment) < len(letters):
-            return True
-        def val(w): return int(''.join(str(assignment[c]) for c in w))
-        return val(word1) + val(word2) == val(result)
-
-    def forward_check(assignment):
-        used = set(assignment.values())
-        for var in letters:
-            if var not in assignment:
-                possible = domains[var] - used
-                if not possible:
-                    return False
-        return True
-
-    def backtrack(assignment):
-        if len(assignment) == len(letters):
-            return assignment if is_valid(assignment) else None
-
-        var = next(v for v in letters if v not in assignment)
-        for val in domains[var]:
-            if val in assignment.values():
-                continue
-            assignment[var] = val
-            if is_valid(assignment) and forward_check(assignment):
-                result_assignment = backtrack(assignment)
-                if result_assignment:
-                    return result_assignment
-            del assignment[var]
-        return None
-
-    return backtrack({})
+
+MODES = ("first", "all", "unique")
+MAX_SOLUTIONS = 1000
+# "all" asks for one more than it returns, to tell a complete list from a truncated one.
+LIMITS = {"first": 1, "all": MAX_SOLUTIONS + 1, "unique": 2}
+MAX_CACHED_SOLUTIONS = 100
+CUSTOM_DEADLINE = 2.0
+JOB_DEADLINE = 30.0
+
+solution_cache = SolutionCache(path=os.environ.get("CRYPT_CACHE_PATH"))
+catalogue = Catalogue()
+
+
+def normalize_equation(text):
+    # Raises ValueError for malformed equations before any work is queued.
+    equation = text.upper().replace(' ', '')
+    products = vectorized.parse_equation(equation)
+    if len(set(''.join(w for sign, ws in products for w in ws))) > 10:
+        raise ValueError("At most 10 distinct letters are allowed")
+    return equation
+
+
+def solve_equation_cached(equation, limit=1, stats=None, deadline=None):
+    # With a deadline, cache misses are solved in the shared solver pool and may raise
+    # solver_pool.SolverTimeout or solver_pool.SolverBusy.
+    key, reverse = canonicalize(normalize_equation(equation))
+    solutions = solution_cache.get(key, limit)
+    if solutions is None:
+        start = time.perf_counter()
+        if deadline is None:
+            solve_stats = {}
+            found = vectorized.solve_equation(key, limit, solve_stats)
+        else:
+            found, solve_stats = solver_pool.run(vectorized.solve_job, key, limit, deadline=deadline)
+        metrics.record_solver('crypt_' + solve_stats['engine'], solve_stats, time.perf_counter() - start)
+        if stats is not None:
+            stats.update(solve_stats)
+        solutions = [encode(s) for s in found]
+        if len(solutions) <= MAX_CACHED_SOLUTIONS:
+            # Fewer solutions than the limit is every solution there is, which answers any limit.
+            solution_cache.put(key, None if len(solutions) < limit else limit, solutions)
+    elif stats is not None:
+        stats['nodes'] = 0
+        stats['cached'] = True
+    return [decode(digits, reverse) for digits in solutions]
+
+
+def solve_cached(addends, result, limit=1, stats=None, deadline=None):
+    if not result or not all(addends):
+        return []
+    return solve_equation_cached('+'.join(addends) + '=' + result, limit, stats, deadline)
+
+
+def solve_crypt(word1, word2, result, stats=None):
+    solutions = solve_cached([word1, word2], result, 1, stats)
+    return solutions[0] if solutions else None
+
+
+def solve_words(equation, limit):
+    stats = {}
+    solutions = vectorized.solve_equation(equation, limit, stats)
+    return {"solvable": bool(solutions), "solutions": solutions[:MAX_SOLUTIONS],
+            "count": min(len(solutions), MAX_SOLUTIONS), "truncated": len(solutions) > MAX_SOLUTIONS,
+            "nodes": stats["nodes"], "engine": stats["engine"]}
+
+
+def requested_equation(data):
+    # Either a full equation such as "SEND+MORE=MONEY" or "AB*C=DE", or the word1/word2/result fields.
+    if data.get("equation"):
+        return normalize_equation(data["equation"])
+    words = [data.get(field, "").upper().strip() for field in ("word1", "word2", "result")]
+    if not all(words):
+        raise ValueError("All fields are required")
+    if not all(w.isalpha() for w in words):
+        raise ValueError("Only letters are allowed")
+    return normalize_equation(f"{words[0]}+{words[1]}={words[2]}")
+
+
+def solver_error(error):
+    if isinstance(error, solver_pool.SolverTimeout):
+        return jsonify({"error": "This puzzle took too long to solve.", "timed_out": True}), 503
+    return jsonify({"error": "The solver is busy, please try again.", "busy": True}), 503
+
+
+def warm_up():
+    for puzzles in PUZZLES.values():
+        for word1, word2, result in puzzles:
+            solve_crypt(word1, word2, result)
+
+
+# A player's game is their place in each difficulty's rotation and the puzzle in play, stored
+# as text: "1,0,3|SEND+MORE=MONEY|75160892|-5------", with the solution and the player's
+# entries as one digit (or '-' for none) per letter in alphabetical order.
+
+def encode_game(game):
+    index = ','.join(str(game["index"][d]) for d in PUZZLES)
+    puzzle = game["puzzle"]
+    if puzzle is None:
+        return index.encode()
+    letters = sorted(puzzle["solution"])
+    entries = puzzle["user_entries"]
+    return '|'.join((index, f"{puzzle['word1']}+{puzzle['word2']}={puzzle['result']}",
+                     ''.join(str(puzzle["solution"][l]) for l in letters),
+                     ''.join(str(entries[l]) if l in entries else '-' for l in letters))).encode()
+
+
+def decode_game(data):
+    fields = data.decode().split('|')
+    game = {"index": dict(zip(PUZZLES, map(int, fields[0].split(',')))), "puzzle": None}
+    if len(fields) > 1:
+        words, result = fields[1].split('=')
+        word1, word2 = words.split('+')
+        letters = sorted(set(word1 + word2 + result))
+        game["puzzle"] = {
+            "word1": word1,
+            "word2": word2,
+            "result": result,
+            "solution": {l: int(d) for l, d in zip(letters, fields[2])},
+            "user_entries": {l: int(d) for l, d in zip(letters, fields[3]) if d != '-'}
+        }
+    return game
+
+
+games = game_state.make_store("crypt_arithmetic", encode_game, decode_game)
+
+
+def current_game():
+    game = games.get(game_state.player_id())
+    if game is None:
+        game = {"index": dict.fromkeys(PUZZLES, 0), "puzzle": None}
+    return game
 
 
 @crypt_arithmetic.route('/crypt-arithmetic')
@@ -84,51 +171,86 @@ def game():
 
 @crypt_arithmetic.route('/crypt-arithmetic/get-puzzle', methods=['POST'])
 def get_puzzle():
-    global current_puzzle, puzzle_index
+    game = current_game()
     difficulty = request.json.get("difficulty", "medium")
+    if difficulty not in PUZZLES:
+        return jsonify({"error": "Unknown difficulty"}), 400
+
+    # Mined puzzles carry their unique solution, so serving one never runs the solver.
+    mined = catalogue.sample(difficulty)
+    if mined:
+        game["puzzle"] = {
+            "word1": mined["word1"],
+            "word2": mined["word2"],
+            "result": mined["result"],
+            "solution": mined["solution"],
+            "user_entries": {}
+        }
+        games.put(game_state.player_id(), game)
+        return jsonify({
+            "word1": mined["word1"],
+            "word2": mined["word2"],
+            "result": mined["result"],
+            "letters": sorted(mined["solution"].keys())
+        })
+
     puzzles = PUZZLES[difficulty]
     total = len(puzzles)
 
     for _ in range(total):
-        idx = puzzle_index[difficulty]
+        idx = game["index"][difficulty]
         word1, word2, result = puzzles[idx]
         solution = solve_crypt(word1, word2, result)
-        puzzle_index[difficulty] = (idx + 1) % total
+        game["index"][difficulty] = (idx + 1) % total
         if solution:
-            current_puzzle = {
+            game["puzzle"] = {
                 "word1": word1,
                 "word2": word2,
                 "result": result,
                 "solution": solution,
                 "user_entries": {}
             }
+            games.put(game_state.player_id(), game)
             return jsonify({
                 "word1": word1,
                 "word2": word2,
                 "result": result,
                 "letters": sorted(solution.keys())
             })
+    games.put(game_state.player_id(), game)
     return jsonify({"error": "No solvable puzzle found"}), 500
 
 
 @crypt_arithmetic.route('/crypt-arithmetic/custom-check', methods=['POST'])
 def custom_check():
-    data = request.json
-    word1 = data.get("word1", "").upper()
-    word2 = data.get("word2", "").upper()
-    result = data.get("result", "").upper()
-    solution = solve_crypt(word1, word2, result)
-    if solution:
-        return jsonify({"solvable": True, "letters": sorted(solution.keys())})
-    return jsonify({"solvable": False})
+    try:
+        equation = requested_equation(request.json)
+        solutions = solve_equation_cached(equation, 1, deadline=CUSTOM_DEADLINE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except (solver_pool.SolverTimeout, solver_pool.SolverBusy) as e:
+        return solver_error(e)
+    if solutions:
+        return jsonify({"solvable": True, "equation": equation, "letters": sorted(solutions[0].keys())})
+    return jsonify({"solvable": False, "equation": equation})
+
+
+NO_PUZZLE = {"error": "No puzzle in play. Please get a puzzle first."}
 
 
 @crypt_arithmetic.route('/crypt-arithmetic/check-letter', methods=['POST'])
 def check_letter():
+    game = current_game()
+    current_puzzle = game['puzzle']
+    if current_puzzle is None:
+        return jsonify(NO_PUZZLE), 400
     data = request.json
     letter = data['letter']
     digit = int(data['digit'])
+    if letter not in current_puzzle['solution'] or not 0 <= digit <= 9:
+        return jsonify({"error": "Unknown letter or digit"}), 400
     current_puzzle['user_entries'][letter] = digit
+    games.put(game_state.player_id(), game)
 
     for k, v in current_puzzle['user_entries'].items():
         if k != letter and v == digit:
@@ -140,6 +262,10 @@ def check_letter():
 
 @crypt_arithmetic.route('/crypt-arithmetic/get-hint')
 def get_hint():
+    game = current_game()
+    current_puzzle = game['puzzle']
+    if current_puzzle is None:
+        return jsonify(NO_PUZZLE), 400
     remaining = [l for l in current_puzzle['solution'] if
                  l not in current_puzzle['user_entries'] or
                  current_puzzle['user_entries'][l] != current_puzzle['solution'][l]]
@@ -148,33 +274,48 @@ def get_hint():
     letter = random.choice(remaining)
     digit = current_puzzle['solution'][letter]
     current_puzzle['user_entries'][letter] = digit
+    games.put(game_state.player_id(), game)
     return jsonify({"letter": letter, "digit": digit})
 
 @crypt_arithmetic.route('/crypt-arithmetic/check-custom', methods=['POST'])
 def check_custom():
     data = request.json
-    word1 = data.get("word1", "").upper().strip()
-    word2 = data.get("word2", "").upper().strip()
-    result = data.get("result", "").upper().strip()
-    
-    if not word1 or not word2 or not result:
-        return jsonify({"error": "All fields are required"}), 400
-    
-    if not word1.isalpha() or not word2.isalpha() or not result.isalpha():
-        return jsonify({"error": "Only letters are allowed"}), 400
-    
-    solution = solve_crypt(word1, word2, result)
-    if solution:
-        return jsonify({
-            "solvable": True,
-            "solution": solution,
-            "letters": sorted(solution.keys())
-        })
-    return jsonify({"solvable": False, "solution": None})
+    try:
+        equation = requested_equation(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mode = data.get("mode", "first")
+    if mode not in MODES:
+        return jsonify({"error": f"Mode must be one of {list(MODES)}"}), 400
+
+    stats = {}
+    try:
+        solutions = solve_equation_cached(equation, LIMITS[mode], stats, deadline=CUSTOM_DEADLINE)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except (solver_pool.SolverTimeout, solver_pool.SolverBusy) as e:
+        return solver_error(e)
+    if not solutions:
+        return jsonify({"solvable": False, "equation": equation, "solution": None, "nodes": stats["nodes"]})
+    response = {
+        "solvable": True,
+        "equation": equation,
+        "solution": solutions[0],
+        "letters": sorted(solutions[0].keys()),
+        "nodes": stats["nodes"]
+    }
+    if mode == "all":
+        response["solutions"] = solutions[:MAX_SOLUTIONS]
+        response["count"] = len(response["solutions"])
+        response["truncated"] = len(solutions) > MAX_SOLUTIONS
+    elif mode == "unique":
+        response["unique"] = len(solutions) == 1
+    return jsonify(response)
 
 @crypt_arithmetic.route('/crypt-arithmetic/get-puzzle-by-index', methods=['POST'])
 def get_puzzle_by_index():
-    global current_puzzle
+    game = current_game()
     data = request.json
     difficulty = data.get("difficulty", "medium")
     index = data.get("index", 0)
@@ -188,13 +329,14 @@ def get_puzzle_by_index():
         word1, word2, result = puzzles[index]
         solution = solve_crypt(word1, word2, result)
         if solution:
-            current_puzzle = {
+            game["puzzle"] = {
                 "word1": word1,
                 "word2": word2,
                 "result": result,
                 "solution": solution,
                 "user_entries": {}
             }
+            games.put(game_state.player_id(), game)
             return jsonify({
                 "word1": word1,
                 "word2": word2,
@@ -205,3 +347,25 @@ def get_puzzle_by_index():
         return jsonify({"error": "Puzzle not solvable"}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+
+@crypt_arithmetic.route('/crypt-arithmetic/jobs', methods=['POST'])
+def submit_job():
+    data = request.json
+    mode = data.get("mode", "all")
+    try:
+        equation = requested_equation(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if mode not in MODES:
+        return jsonify({"error": f"Mode must be one of {list(MODES)}"}), 400
+    try:
+        job_id = solver_pool.submit_job(solve_words, equation, LIMITS[mode], deadline=JOB_DEADLINE)
+    except solver_pool.SolverBusy as e:
+        return solver_error(e)
+    return jsonify({"job_id": job_id, "status_url": f"/solver/jobs/{job_id}"}), 202
+
+
+@crypt_arithmetic.route('/crypt-arithmetic/cache-stats')
+def cache_stats():
+    return jsonify(dict(solution_cache.stats(), catalogue=catalogue.stats(), games=games.stats()))
@@ -0,0 +1,49 @@
+import json, os, random, sqlite3, threading
+
+# Read side of the mined puzzle catalogue (see miner.py). Rows are stored ordered by
+# difficulty, so each difficulty is a contiguous id range and sampling is one primary-key read.
+
+CATALOGUE_PATH = os.environ.get(
+    "CRYPT_CATALOGUE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalogue.db"))
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class Catalogue:
+    def __init__(self, path=CATALOGUE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = None
+        self.pid = None
+        self.ranges = None
+
+    def _connect(self):
+        # Opened lazily and per process: a connection must not cross a gunicorn fork.
+        if self.conn is None or self.pid != os.getpid():
+            if not os.path.exists(self.path):
+                return None
+            self.conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self.pid = os.getpid()
+            self.ranges = {d: (lo, hi) for d, lo, hi in self.conn.execute(
+                "SELECT difficulty, MIN(id), MAX(id) FROM puzzles GROUP BY difficulty")}
+        return self.conn
+
+    def sample(self, difficulty, rng=random):
+        with self.lock:
+            conn = self._connect()
+            if conn is None or difficulty not in self.ranges:
+                return None
+            lo, hi = self.ranges[difficulty]
+            row = conn.execute(
+                "SELECT word1, word2, result, solution, nodes FROM puzzles WHERE id = ?",
+                (rng.randint(lo, hi),)).fetchone()
+        word1, word2, result, solution, nodes = row
+        return {"word1": word1, "word2": word2, "result": result,
+                "solution": json.loads(solution), "nodes": nodes}
+
+    def stats(self):
+        with self.lock:
+            if self._connect() is None:
+                return {"available": False}
+            return {"available": True,
+                    "puzzles": {d: hi - lo + 1 for d, (lo, hi) in self.ranges.items()}}
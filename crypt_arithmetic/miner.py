@@ -0,0 +1,135 @@
+import argparse, itertools, json, os, random, sqlite3, time
+from multiprocessing import Pool
+
+from .catalogue import CATALOGUE_PATH, DIFFICULTIES
+from . import solver
+
+# Offline puzzle miner: python -m crypt_arithmetic.miner words.txt
+# Enumerates WORD1 + WORD2 = RESULT candidates from a local word list, solves them across a
+# process pool, keeps the uniquely solvable ones, grades them by the solver's search-node count
+# and writes an indexed SQLite catalogue for the blueprint to sample from. Progress is kept in
+# OUTPUT.work and committed every COMMIT_EVERY results; a rerun skips every candidate already
+# solved there, so an interrupted or extended run picks up where it stopped.
+
+COMMIT_EVERY = 10000
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mined (
+    word1 TEXT, word2 TEXT, result TEXT, solution TEXT, nodes INTEGER,
+    PRIMARY KEY (word1, word2, result)
+);
+CREATE TABLE IF NOT EXISTS tried (
+    word1 TEXT, word2 TEXT, result TEXT, PRIMARY KEY (word1, word2, result)
+) WITHOUT ROWID;
+"""
+
+
+def load_words(path, min_len, max_len):
+    with open(path) as f:
+        words = {w.strip().upper() for w in f}
+    return sorted(w for w in words if w.isalpha() and w.isascii() and min_len <= len(w) <= max_len)
+
+
+def candidates(words):
+    by_length = {}
+    for w in words:
+        by_length.setdefault(len(w), []).append(w)
+    for i, word1 in enumerate(words):
+        for word2 in words[i:]:
+            letters = set(word1 + word2)
+            if len(letters) > 10:
+                continue
+            longest = max(len(word1), len(word2))
+            for length in (longest, longest + 1):
+                for result in by_length.get(length, []):
+                    if len(letters | set(result)) <= 10:
+                        yield word1, word2, result
+
+
+def reservoir(items, k, rng):
+    # A uniform sample of k items from an iterable of unknown length, holding only k at a time.
+    sample = []
+    for i, item in enumerate(items):
+        if i < k:
+            sample.append(item)
+        else:
+            j = rng.randrange(i + 1)
+            if j < k:
+                sample[j] = item
+    return sample
+
+
+def grade(candidate):
+    word1, word2, result = candidate
+    stats = {}
+    solutions = solver.solve([word1, word2], result, 2, stats)
+    if len(solutions) != 1:
+        return candidate, None
+    return candidate, (solutions[0], stats["nodes"])
+
+
+def write_catalogue(db, path):
+    # Difficulty is the node-count tercile over everything mined so far. The served table is
+    # rebuilt ordered by difficulty so each level is one contiguous id range.
+    rows = db.execute("SELECT word1, word2, result, solution, nodes FROM mined ORDER BY nodes").fetchall()
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    out = sqlite3.connect(tmp)
+    out.execute("CREATE TABLE puzzles (id INTEGER PRIMARY KEY, word1 TEXT, word2 TEXT, result TEXT, "
+                "solution TEXT, nodes INTEGER, difficulty TEXT)")
+    out.execute("CREATE INDEX puzzles_difficulty ON puzzles (difficulty)")
+    for rank, row in enumerate(rows):
+        difficulty = DIFFICULTIES[rank * len(DIFFICULTIES) // len(rows)]
+        out.execute("INSERT INTO puzzles (word1, word2, result, solution, nodes, difficulty) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", row + (difficulty,))
+    out.commit()
+    out.close()
+    os.replace(tmp, path)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mine uniquely solvable crypt-arithmetic puzzles.")
+    parser.add_argument("words", help="word list, one word per line")
+    parser.add_argument("-o", "--output", default=CATALOGUE_PATH)
+    parser.add_argument("--min-len", type=int, default=2)
+    parser.add_argument("--max-len", type=int, default=6)
+    parser.add_argument("--max-candidates", type=int, default=200000)
+    parser.add_argument("--sample", action="store_true", help="shuffle candidates before truncating")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    db = sqlite3.connect(args.output + ".work")
+    db.executescript(SCHEMA)
+    done = set(db.execute("SELECT word1, word2, result FROM tried UNION SELECT word1, word2, result FROM mined"))
+    words = load_words(args.words, args.min_len, args.max_len)
+    pending = (c for c in candidates(words) if c not in done)
+    if args.sample:
+        pending = reservoir(pending, args.max_candidates, random.Random(args.seed))
+    else:
+        pending = list(itertools.islice(pending, args.max_candidates))
+
+    start = time.perf_counter()
+    kept = 0
+    with Pool(args.workers) as pool:
+        for i, (candidate, graded) in enumerate(pool.imap_unordered(grade, pending, chunksize=256), 1):
+            db.execute("INSERT OR IGNORE INTO tried VALUES (?, ?, ?)", candidate)
+            if graded:
+                solution, nodes = graded
+                db.execute("INSERT OR IGNORE INTO mined VALUES (?, ?, ?, ?, ?)",
+                           candidate + (json.dumps(solution), nodes))
+                kept += 1
+            if i % COMMIT_EVERY == 0:
+                db.commit()
+    db.commit()
+    elapsed = time.perf_counter() - start
+    total = write_catalogue(db, args.output)
+    db.close()
+    print(f"{len(words)} words, {len(pending)} new candidates solved in {elapsed:.1f}s "
+          f"({len(pending) / max(elapsed, 1e-9):.0f}/s), {kept} unique, {len(done)} tried in earlier runs; "
+          f"catalogue has {total} puzzles -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import json, os, string, threading
+from collections import OrderedDict
+
+# Solutions keyed by the equation's letter pattern: letters are relabelled A, B, C... in order
+# of first appearance, so SEND+MORE=MONEY and every relabelled copy of it share one entry.
+# A canonical solution is stored as a digit string in canonical letter order.
+
+MAX_ENTRIES = 5000
+
+
+def canonicalize(equation):
+    mapping = {}
+    key = []
+    for c in equation:
+        if c.isalpha():
+            if c not in mapping:
+                mapping[c] = string.ascii_uppercase[len(mapping)]
+            c = mapping[c]
+        key.append(c)
+    reverse = {c: l for l, c in mapping.items()}
+    return ''.join(key), reverse
+
+
+def encode(solution):
+    return ''.join(str(solution[l]) for l in sorted(solution))
+
+
+def decode(digits, reverse):
+    return {reverse[string.ascii_uppercase[i]]: int(d) for i, d in enumerate(digits)}
+
+
+class SolutionCache:
+    def __init__(self, max_entries=MAX_ENTRIES, path=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        if path:
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            self._store((record['key'], record['limit']), record['solutions'])
+        if len(lines) > 2 * len(self.entries):
+            self._rewrite()
+
+    def _rewrite(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            for (key, limit), solutions in self.entries.items():
+                f.write(json.dumps({'key': key, 'limit': limit, 'solutions': solutions}) + '\n')
+        os.replace(tmp, self.path)
+
+    def _store(self, entry_key, solutions):
+        self.entries[entry_key] = solutions
+        self.entries.move_to_end(entry_key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, limit):
+        # Complete lists are stored with limit None and answer any limit.
+        with self.lock:
+            for entry_key in ((key, limit), (key, None)):
+                solutions = self.entries.get(entry_key)
+                if solutions is not None:
+                    self.entries.move_to_end(entry_key)
+                    self.hits += 1
+                    return solutions[:limit] if limit else solutions
+            self.misses += 1
+            return None
+
+    def put(self, key, limit, solutions):
+        with self.lock:
+            self._store((key, limit), solutions)
+            if self.path:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps({'key': key, 'limit': limit, 'solutions': solutions}) + '\n')
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "persistent": bool(self.path),
+            }
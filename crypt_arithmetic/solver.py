@@ -0,0 +1,128 @@
+import itertools
+
+# Column-wise crypt-arithmetic search. A puzzle is a list of (word, sign) terms whose signed
+# values must sum to zero, so WORD1 + WORD2 = RESULT is [(WORD1, 1), (WORD2, 1), (RESULT, -1)].
+# Columns are filled from the least significant digit with the running carry. Within a column
+# the last unassigned letter is read off the column sum modulo 10 instead of being enumerated,
+# and a column whose sum is not divisible by 10 is cut off before any higher column is tried.
+
+# MOD_DIGITS[c][r] lists the digits d with c * d ≡ r (mod 10).
+MOD_DIGITS = [[[d for d in range(10) if c * d % 10 == r] for r in range(10)] for c in range(10)]
+
+
+class _Done(Exception):
+    pass
+
+
+def compile_columns(terms):
+    letters = sorted(set(''.join(word for word, sign in terms)))
+    index = {l: i for i, l in enumerate(letters)}
+    width = max(len(word) for word, sign in terms)
+    columns = []
+    for c in range(width):
+        coeffs = {}
+        for word, sign in terms:
+            if c < len(word):
+                i = index[word[-1 - c]]
+                coeffs[i] = coeffs.get(i, 0) + sign
+        columns.append({i: v for i, v in coeffs.items() if v})
+    return letters, columns
+
+
+def solve_terms(terms, limit=1, stats=None):
+    if not terms or any(not word for word, sign in terms):
+        return []
+    letters, columns = compile_columns(terms)
+    if len(letters) > 10:
+        return []
+    index = {l: i for i, l in enumerate(letters)}
+    leading = 0
+    for word, sign in terms:
+        leading |= 1 << index[word[0]]
+
+    # Each column contributes the letters it sees first; letters whose coefficients cancel in
+    # every column are only constrained by distinctness and are assigned at the end.
+    seen = 0
+    plan = []
+    for coeffs in columns:
+        new = [i for i in coeffs if not seen >> i & 1]
+        # The letter read off the column sum goes last; an odd coefficient not divisible by 5
+        # pins it to one digit.
+        new.sort(key=lambda i: coeffs[i] % 2 == 1 and coeffs[i] % 5 != 0)
+        for i in new:
+            seen |= 1 << i
+        plan.append((new, list(coeffs.items())))
+    free = [i for i in range(len(letters)) if not seen >> i & 1]
+
+    digits = [0] * len(letters)
+    solutions = []
+    nodes = 0
+
+    def allowed(i, d, used):
+        return not used >> d & 1 and (d or not leading >> i & 1)
+
+    def record():
+        solutions.append({l: digits[i] for i, l in enumerate(letters)})
+        if limit and len(solutions) >= limit:
+            raise _Done
+
+    def assign_free(used):
+        nonlocal nodes
+        available = [d for d in range(10) if not used >> d & 1]
+        for choice in itertools.permutations(available, len(free)):
+            if all(d or not leading >> i & 1 for i, d in zip(free, choice)):
+                nodes += 1
+                for i, d in zip(free, choice):
+                    digits[i] = d
+                record()
+
+    def column(c, carry, used):
+        if c == len(plan):
+            if carry == 0:
+                assign_free(used)
+            return
+        fill(c, 0, carry, used)
+
+    def fill(c, j, carry, used):
+        nonlocal nodes
+        new, coeffs = plan[c]
+        if j < len(new) - 1:
+            i = new[j]
+            for d in range(10):
+                if allowed(i, d, used):
+                    nodes += 1
+                    digits[i] = d
+                    fill(c, j + 1, carry, used | 1 << d)
+            return
+        if not new:
+            total = carry + sum(v * digits[i] for i, v in coeffs)
+            if total % 10 == 0:
+                column(c + 1, total // 10, used)
+            return
+        last = new[-1]
+        coeff = 0
+        partial = carry
+        for i, v in coeffs:
+            if i == last:
+                coeff = v
+            else:
+                partial += v * digits[i]
+        for d in MOD_DIGITS[coeff % 10][-partial % 10]:
+            if allowed(last, d, used):
+                nodes += 1
+                digits[last] = d
+                column(c + 1, (partial + coeff * d) // 10, used | 1 << d)
+
+    try:
+        column(0, 0, 0)
+    except _Done:
+        pass
+    if stats is not None:
+        stats['nodes'] = nodes
+        stats['solutions'] = len(solutions)
+    return solutions
+
+
+def solve(addends, result, limit=1, stats=None):
+    return solve_terms([(word, 1) for word in addends] + [(result, -1)], limit, stats)
+
@@ -0,0 +1,155 @@
+import itertools, re
+from math import perm
+import numpy as np
+
+from . import solver
+
+# General crypt-arithmetic equations such as SEND+MORE=MONEY, THREE+THREE+TWO+TWO+ONE=ELEVEN,
+# COUNT-COIN=SNUB or AB*CD=EFG. An equation is compiled into positional weights per letter:
+# each word's value is a dot product of the letter digits with its weight row, so a batch of
+# digit permutations is evaluated as a few matrix products. Additive equations go to the
+# column solver unless their units column alone holds more than COLUMN_MAX_LOW_LETTERS letters:
+# the column search enumerates those before its first prune, which is where long column sums
+# lose to brute-force batches.
+
+COLUMN_MAX_LOW_LETTERS = 5
+BATCH_ROWS = 200000
+MAX_VALUE = 2 ** 62
+TOKEN = re.compile(r'[A-Z]+|[-+*=]')
+
+
+def parse_equation(text):
+    # Returns (sign, [words]) products whose signed sum is zero; right-hand side terms are negated.
+    text = text.upper().replace(' ', '')
+    tokens = TOKEN.findall(text)
+    if ''.join(tokens) != text or tokens.count('=') != 1:
+        raise ValueError("Use words joined by +, - or * with a single =")
+    products, sign, side, expect_word = [], 1, 1, True
+    for token in tokens:
+        if expect_word:
+            if not token.isalpha():
+                raise ValueError("Expected a word after an operator")
+            if products and products[-1][2]:
+                products[-1][1].append(token)
+                products[-1][2] = False
+            else:
+                products.append([sign * side, [token], False])
+        elif token == '*':
+            products[-1][2] = True
+        elif token == '=':
+            side, sign = -1, 1
+        else:
+            sign = 1 if token == '+' else -1
+        expect_word = not expect_word
+    if expect_word:
+        raise ValueError("The equation cannot end with an operator")
+    return [(s, words) for s, words, pending in products]
+
+
+def is_linear(products):
+    return all(len(words) == 1 for sign, words in products)
+
+
+class CompiledEquation:
+    def __init__(self, products):
+        self.products = products
+        words = [w for sign, ws in products for w in ws]
+        self.letters = sorted(set(''.join(words)))
+        if len(self.letters) > 10:
+            raise ValueError("At most 10 distinct letters are allowed")
+        index = {l: i for i, l in enumerate(self.letters)}
+        self.leading = sorted({index[w[0]] for w in words})
+        bound = sum(10 ** sum(len(w) for w in ws) for sign, ws in products)
+        if bound >= MAX_VALUE:
+            raise ValueError("The numbers in this equation are too large")
+
+        def weights(word):
+            row = np.zeros(len(self.letters), dtype=np.int64)
+            for place, l in enumerate(reversed(word)):
+                row[index[l]] += 10 ** place
+            return row
+
+        if is_linear(products):
+            self.linear = sum(sign * weights(ws[0]) for sign, ws in products)
+        else:
+            self.linear = None
+            self.factors = [(sign, np.stack([weights(w) for w in ws], axis=1)) for sign, ws in products]
+
+    def evaluate(self, digits):
+        if self.linear is not None:
+            return digits @ self.linear == 0
+        total = np.zeros(len(digits), dtype=np.int64)
+        for sign, matrix in self.factors:
+            total += sign * np.prod(digits @ matrix, axis=1)
+        return total == 0
+
+
+_templates = {}
+
+
+def _template(available, length):
+    key = (available, length)
+    if key not in _templates:
+        _templates[key] = np.array(list(itertools.permutations(range(available), length)),
+                                   dtype=np.int64).reshape(-1, length)
+    return _templates[key]
+
+
+def permutation_batches(n):
+    # Fixes a prefix of the first letters and expands the rest from a cached index template,
+    # keeping each batch under BATCH_ROWS rows.
+    prefix = 0
+    while prefix < n and perm(10 - prefix, n - prefix) > BATCH_ROWS:
+        prefix += 1
+    template = _template(10 - prefix, n - prefix)
+    for head in itertools.permutations(range(10), prefix):
+        rest = np.array([d for d in range(10) if d not in head], dtype=np.int64)
+        tail = rest[template]
+        if prefix:
+            yield np.hstack([np.broadcast_to(np.array(head, dtype=np.int64), (len(tail), prefix)), tail])
+        else:
+            yield tail
+
+
+def solve_vectorized(products, limit=1, stats=None):
+    equation = CompiledEquation(products)
+    letters = equation.letters
+    solutions, candidates = [], 0
+    for batch in permutation_batches(len(letters)):
+        batch = batch[np.all(batch[:, equation.leading] != 0, axis=1)]
+        candidates += len(batch)
+        for row in batch[equation.evaluate(batch)]:
+            solutions.append({l: int(d) for l, d in zip(letters, row)})
+            if limit and len(solutions) >= limit:
+                break
+        if limit and len(solutions) >= limit:
+            break
+    if stats is not None:
+        stats['nodes'] = candidates
+        stats['solutions'] = len(solutions)
+        stats['engine'] = 'vectorized'
+    return solutions
+
+
+def use_columns(products):
+    return is_linear(products) and len({ws[0][-1] for sign, ws in products}) <= COLUMN_MAX_LOW_LETTERS
+
+
+def solve_equation(text, limit=1, stats=None):
+    products = parse_equation(text)
+    letters = set(''.join(w for sign, ws in products for w in ws))
+    if len(letters) > 10:
+        raise ValueError("At most 10 distinct letters are allowed")
+    if use_columns(products):
+        solutions = solver.solve_terms([(ws[0], sign) for sign, ws in products], limit, stats)
+        if stats is not None:
+            stats['engine'] = 'columns'
+        return solutions
+    return solve_vectorized(products, limit, stats)
+
+
+def solve_job(text, limit=1):
+    # Entry point for the solver pool, where a stats dict passed in would not come back.
+    stats = {}
+    solutions = solve_equation(text, limit, stats)
+    return solutions, stats
@@ -1,14 +1,24 @@
 from flask import Blueprint, request, jsonify, render_template
-import random, heapq
+import random, heapq, struct, time
+import game_state, metrics, solver_pool
+from .distance_table import load_table, rank
+from . import sliding
 
 eight_puzzle = Blueprint('eight_puzzle', __name__, template_folder='templates')
 
 goal_state = [1, 2, 3, 4, 5, 6, 7, 8, 0]
 tile_positions = {val: (i // 3, i % 3) for i, val in enumerate(goal_state)}
 
-current_state = goal_state.copy()
-solution_path = []
-score = 0
+_distances = None
+
+SIZES = (3, 4, 5)
+SCRAMBLE_MOVES = {4: 40, 5: 40}
+SOLVE_DEADLINE = 2.0
+JOB_DEADLINE = 30.0
+
+# A player's game is the board, width, score and the optimal plan from the current board, with
+# plan[step] being the next state along it. Between requests it lives in the game state store.
+plan_stats = {"followed": 0, "deviations": 0, "replans": 0}
 
 def manhattan(state):
     return sum(abs((i // 3) - tile_positions[val][0]) + abs((i % 3) - tile_positions[val][1])
@@ -27,18 +37,66 @@ def get_neighbors(state):
             moves.append((new_state, new_state[idx]))
     return moves
 
-def a_star(start):
-    visited = set()
-    heap = [(manhattan(start), 0, start, [])]
+# Packed states hold tile i in bits 4*i..4*i+3; the blank is the zero nibble.
+MANHATTAN = [[0] * 9] + [[abs(i // 3 - tile_positions[t][0]) + abs(i % 3 - tile_positions[t][1])
+                          for i in range(9)] for t in range(1, 9)]
+ADJACENT = [[nx * 3 + ny for nx, ny in [(i // 3 - 1, i % 3), (i // 3 + 1, i % 3), (i // 3, i % 3 - 1), (i // 3, i % 3 + 1)]
+             if 0 <= nx < 3 and 0 <= ny < 3] for i in range(9)]
+
+def pack(state):
+    packed = 0
+    for i, val in enumerate(state):
+        packed |= val << (4 * i)
+    return packed
+
+def unpack(packed):
+    return [(packed >> (4 * i)) & 15 for i in range(9)]
+
+GOAL_PACKED = pack(goal_state)
+
+def a_star(start, stats=None):
+    root = pack(start)
+    h = manhattan(start)
+    best_g = {root: 0}
+    parent = {root: None}
+    # Entries are (f, h, state, blank): among equal f the deeper node (smaller h) pops first.
+    heap = [(h, h, root, start.index(0))]
+    expanded = peak_open = 0
+    found = False
     while heap:
-        f, g, state, path = heapq.heappop(heap)
-        if state == goal_state:
-            return path
-        visited.add(tuple(state))
-        for neighbor, tile_moved in get_neighbors(state):
-            if tuple(neighbor) not in visited:
-                heapq.heappush(heap, (g + 1 + manhattan(neighbor), g + 1, neighbor, path + [neighbor]))
-    return []
+        f, h, state, blank = heapq.heappop(heap)
+        g = f - h
+        if g > best_g[state]:
+            continue
+        if state == GOAL_PACKED:
+            found = True
+            break
+        expanded += 1
+        g += 1
+        for nidx in ADJACENT[blank]:
+            tile = (state >> (4 * nidx)) & 15
+            child = state ^ (tile << (4 * nidx)) ^ (tile << (4 * blank))
+            if g < best_g.get(child, g + 1):
+                best_g[child] = g
+                parent[child] = state
+                nh = h - MANHATTAN[tile][nidx] + MANHATTAN[tile][blank]
+                heapq.heappush(heap, (g + nh, nh, child, nidx))
+        if len(heap) > peak_open:
+            peak_open = len(heap)
+
+    if stats is not None:
+        stats['nodes_expanded'] = expanded
+        stats['peak_open'] = peak_open
+        stats['states_seen'] = len(best_g)
+    metrics.record_solver('a_star', {'nodes_expanded': expanded, 'peak_open': peak_open})
+    if not found:
+        return []
+    path = []
+    while state != root:
+        path.append(unpack(state))
+        state = parent[state]
+    path.reverse()
+    return path
 
 def is_solvable(state):
     inv = 0
@@ -48,6 +106,59 @@ def is_solvable(state):
                 inv += 1
     return inv % 2 == 0
 
+def solve_board(state, width, max_depth=None):
+    # IDA* for 4x4 and 5x5 boards runs in the solver pool; a timeout reads as an unfinished solve.
+    start = time.perf_counter()
+    try:
+        path, stats = solver_pool.run(sliding.solve, state, width, max_depth, deadline=SOLVE_DEADLINE)
+        metrics.record_solver('ida_star', stats, time.perf_counter() - start)
+        return path, stats
+    except (solver_pool.SolverTimeout, solver_pool.SolverBusy):
+        return None, {"complete": False}
+
+def distance_table():
+    # None when distances.bin is missing; callers then fall back to A*.
+    global _distances
+    if _distances is None:
+        _distances = load_table()
+    return _distances
+
+def warm_up():
+    distance_table()
+    for width in SIZES:
+        sliding.pattern_databases(width)
+
+def goal_distance(state):
+    distances = distance_table()
+    if distances is None:
+        return len(a_star(state))
+    return distances[rank(state)]
+
+def next_on_path(state):
+    d = goal_distance(state)
+    for neighbor, tile_moved in get_neighbors(state):
+        if goal_distance(neighbor) < d:
+            return neighbor
+    return None
+
+def heuristic_step(state, width):
+    # For 4x4 and 5x5 boards whose solve ran out of budget: the neighbour that looks closest.
+    if state == sliding.goal(width):
+        return None
+    return min((n for n, tile_moved in sliding.neighbors(state, width)),
+               key=lambda n: sliding.heuristic(n, width))
+
+def optimal_path(state, width=3):
+    if width != 3:
+        return solve_board(state, width)[0]
+    if distance_table() is None:
+        return a_star(state)
+    path = []
+    while state != goal_state:
+        state = next_on_path(state)
+        path.append(state)
+    return path
+
 def shuffle_board():
     state = goal_state.copy()
     while True:
@@ -55,53 +166,177 @@ def shuffle_board():
         if is_solvable(state) and state != goal_state:
             return state
 
+def new_game(state, width=3):
+    return {"width": width, "state": state, "plan": optimal_path(state, width), "step": 0, "score": 0}
+
+# Stored games are a header (width, whether there is a plan, score), the board as one byte per
+# cell, then the unplayed part of the plan: its first state in full and, for every later state,
+# the cell the blank moved to.
+GAME_HEADER = struct.Struct('>BBI')
+
+def encode_game(game):
+    width, plan = game["width"], game["plan"]
+    data = GAME_HEADER.pack(width, plan is not None, game["score"]) + bytes(game["state"])
+    remaining = plan[game["step"]:] if plan is not None else []
+    if remaining:
+        data += bytes(remaining[0]) + bytes(s.index(0) for s in remaining[1:])
+    return data
+
+def decode_game(data):
+    width, has_plan, score = GAME_HEADER.unpack_from(data)
+    cells = width * width
+    body = data[GAME_HEADER.size:]
+    plan = None
+    if has_plan:
+        plan = []
+        if len(body) > cells:
+            state = list(body[cells:2 * cells])
+            plan.append(state)
+            for nidx in body[2 * cells:]:
+                state = state.copy()
+                blank = state.index(0)
+                state[blank], state[nidx] = state[nidx], 0
+                plan.append(state)
+    return {"width": width, "state": list(body[:cells]), "plan": plan, "step": 0, "score": score}
+
+games = game_state.make_store("eight_puzzle", encode_game, decode_game)
+
+def current_game():
+    game = games.get(game_state.player_id())
+    if game is None:
+        game = new_game(goal_state.copy())
+        games.put(game_state.player_id(), game)
+    return game
+
+def grade_move(game, simulated):
+    state, width, plan = game["state"], game["width"], game["plan"]
+    remaining = plan[game["step"]:] if plan is not None else None
+    if remaining and simulated == remaining[0]:
+        plan_stats["followed"] += 1
+        game["step"] += 1
+        return True
+
+    plan_stats["deviations"] += 1
+    new_plan = None
+    if width == 3:
+        correct = goal_distance(simulated) < goal_distance(state)
+        if correct:
+            plan_stats["replans"] += 1
+            new_plan = optimal_path(simulated)
+    else:
+        # A move either gets one closer to the goal or one further away, so the only
+        # question is whether another plan of length len(remaining) - 1 exists.
+        plan_stats["replans"] += 1
+        max_depth = len(remaining) - 1 if remaining is not None else None
+        new_plan, stats = solve_board(simulated, width, max_depth)
+        if remaining is not None and stats["complete"]:
+            correct = new_plan is not None
+        else:
+            correct = sliding.heuristic(simulated, width) < sliding.heuristic(state, width)
+    if new_plan is None and remaining is not None:
+        # Stepping back undoes the deviation, after which the old plan still applies.
+        new_plan = [state] + remaining
+    game["plan"], game["step"] = new_plan, 0
+    return correct
+
 @eight_puzzle.route('/8-puzzle')
 def index():
     return render_template('8puzzle.html')
 
 @eight_puzzle.route('/8-puzzle/shuffle', methods=['POST'])
 def shuffle():
-    global current_state, solution_path, score
-    current_state = shuffle_board()
-    solution_path = a_star(current_state)
-    score = 0
-    return jsonify({"state": current_state, "score": score})
+    data = request.get_json(silent=True) or {}
+    try:
+        size = int(data.get("size", 3))
+    except (AttributeError, TypeError, ValueError):
+        size = None
+    if size not in SIZES:
+        return jsonify({"error": f"Size must be one of {list(SIZES)}"}), 400
+    if size == 3:
+        state = shuffle_board()
+    else:
+        state = sliding.goal(size)
+        while state == sliding.goal(size):
+            state = sliding.scramble(size, SCRAMBLE_MOVES[size])
+    game = new_game(state, size)
+    games.put(game_state.player_id(), game)
+    return jsonify({"state": game["state"], "score": game["score"]})
 
 @eight_puzzle.route('/8-puzzle/move', methods=['POST'])
 def move():
-    global current_state, score
+    game = current_game()
+    state, width = game["state"], game["width"]
     data = request.json
     tile = data['tile']
 
-    idx = current_state.index(0)
-    tile_idx = current_state.index(tile)
-    x1, y1 = idx // 3, idx % 3
-    x2, y2 = tile_idx // 3, tile_idx % 3
+    idx = state.index(0)
+    tile_idx = state.index(tile)
+    x1, y1 = idx // width, idx % width
+    x2, y2 = tile_idx // width, tile_idx % width
     if abs(x1 - x2) + abs(y1 - y2) != 1:
         return jsonify({"valid": False})
 
-    simulated = current_state.copy()
+    simulated = state.copy()
     simulated[idx], simulated[tile_idx] = simulated[tile_idx], simulated[idx]
 
-    new_path = a_star(current_state)
-    correct = new_path and simulated == new_path[0]
-
-    current_state[idx], current_state[tile_idx] = current_state[tile_idx], current_state[idx]
+    correct = grade_move(game, simulated)
+    game["state"] = simulated
 
     if correct:
-        score += 5
+        game["score"] += 5
     else:
-        score = max(0, score - 5)
+        game["score"] = max(0, game["score"] - 5)
+    games.put(game_state.player_id(), game)
 
-    return jsonify({"valid": True, "correct": correct, "state": current_state, "score": score})
+    return jsonify({"valid": True, "correct": correct, "state": simulated, "score": game["score"]})
 
 @eight_puzzle.route('/8-puzzle/hint', methods=['GET'])
 def hint():
-    global current_state, score
-    solution_path = a_star(current_state)
-    if not solution_path:
-        return jsonify({"done": True})
-    current_state = solution_path[0]
-    solution_path.pop(0)
-    score = max(0, score - 2)
-    return jsonify({"state": current_state, "score": score})
\ No newline at end of file
+    game = current_game()
+    plan, step = game["plan"], game["step"]
+    if plan is not None and step < len(plan):
+        plan_stats["followed"] += 1
+        next_state = plan[step]
+        game["step"] += 1
+    elif game["width"] == 3:
+        plan_stats["replans"] += 1
+        next_state = next_on_path(game["state"])
+        if next_state is None:
+            return jsonify({"done": True})
+        game["plan"], game["step"] = optimal_path(next_state), 0
+    else:
+        # Larger boards are solved by new_game() and grade_move() only. Without a plan the last
+        # solve ran out of time, and so would another from here, so hints follow the heuristic
+        # until the player's next move solves again.
+        next_state = heuristic_step(game["state"], game["width"])
+        if next_state is None:
+            return jsonify({"done": True})
+        game["plan"], game["step"] = None, 0
+    game["state"] = next_state
+    game["score"] = max(0, game["score"] - 2)
+    games.put(game_state.player_id(), game)
+    return jsonify({"state": next_state, "score": game["score"]})
+
+def solve_job(state, width):
+    stats = {}
+    path = sliding.ida_star(state, width, None, JOB_DEADLINE, stats)
+    return {"path": path, "moves": len(path) if path is not None else None, "stats": stats}
+
+@eight_puzzle.route('/8-puzzle/jobs', methods=['POST'])
+def submit_job():
+    data = request.json
+    state = data.get("state", [])
+    width = int(data.get("size", 3))
+    if width not in SIZES or sorted(state) != list(range(width * width)):
+        return jsonify({"error": "State must be a permutation of 0..size*size-1"}), 400
+    if not sliding.is_solvable(state, width):
+        return jsonify({"error": "This board cannot be solved"}), 400
+    try:
+        job_id = solver_pool.submit_job(solve_job, state, width, deadline=JOB_DEADLINE)
+    except solver_pool.SolverBusy:
+        return jsonify({"error": "The solver is busy, please try again.", "busy": True}), 503
+    return jsonify({"job_id": job_id, "status_url": f"/solver/jobs/{job_id}"}), 202
+
+@eight_puzzle.route('/8-puzzle/cache-stats', methods=['GET'])
+def cache_stats():
+    return jsonify({"games": games.stats(), "plans": plan_stats})
@@ -0,0 +1,62 @@
+import mmap, os
+from collections import deque
+
+# Exact goal distance for every solvable 8-puzzle state, one byte per state.
+# A state is indexed by its blank position and the Lehmer rank of its 8 tiles halved:
+# solvable states have even tile parity, and ranks 2m and 2m + 1 differ only by
+# swapping the last two tiles, so exactly one of each pair is solvable.
+# Build it offline with `python -m eight_puzzle.distance_table`.
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distances.bin')
+GOAL = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+FACTORIALS = [5040, 720, 120, 24, 6, 2, 1, 1]
+HALF_PERMUTATIONS = 20160
+TABLE_SIZE = 9 * HALF_PERMUTATIONS
+UNREACHED = 255
+
+def rank(state):
+    tiles = [t for t in state if t]
+    r = 0
+    for i in range(7):
+        t = tiles[i]
+        r += sum(1 for u in tiles[i + 1:] if u < t) * FACTORIALS[i]
+    return state.index(0) * HALF_PERMUTATIONS + r // 2
+
+def neighbours(state):
+    idx = state.index(0)
+    x, y = idx // 3, idx % 3
+    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        nx, ny = x + dx, y + dy
+        if 0 <= nx < 3 and 0 <= ny < 3:
+            nidx = nx * 3 + ny
+            new_state = list(state)
+            new_state[idx], new_state[nidx] = new_state[nidx], new_state[idx]
+            yield tuple(new_state)
+
+def build_table():
+    table = bytearray([UNREACHED]) * TABLE_SIZE
+    table[rank(GOAL)] = 0
+    queue = deque([GOAL])
+    while queue:
+        state = queue.popleft()
+        d = table[rank(state)] + 1
+        for n in neighbours(state):
+            r = rank(n)
+            if table[r] == UNREACHED:
+                table[r] = d
+                queue.append(n)
+    return table
+
+def load_table(path=TABLE_PATH):
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+if __name__ == '__main__':
+    table = build_table()
+    with open(TABLE_PATH, 'wb') as f:
+        f.write(table)
+    print(f"Wrote {len(table)} distances (max {max(table)}) to {TABLE_PATH}")
@@ -0,0 +1,319 @@
+import mmap, os, random, time
+from collections import deque
+
+# Width-generic sliding puzzle: states are flat lists read row by row, 0 is the blank.
+# 4×4 and 5×5 boards are solved with IDA* over Manhattan distance plus linear conflicts,
+# maxed with additive pattern databases when their files are present.
+# Build the databases offline with `python -m eight_puzzle.sliding 4 5`.
+
+PDB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pdb')
+PATTERNS = {
+    4: [(1, 2, 3, 4, 7), (5, 6, 9, 10, 13), (8, 11, 12, 14, 15)],
+    5: [(1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20), (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)],
+}
+MAX_NODES = 500000
+TIME_LIMIT = 1.0
+CHECK_EVERY = 1024
+UNREACHED = 255
+
+
+class SolveBudgetExceeded(Exception):
+    pass
+
+
+def goal(width):
+    return list(range(1, width * width)) + [0]
+
+
+def adjacent(width):
+    cells = width * width
+    return [[c for c in (i - width, i + width, i - 1 if i % width else -1, i + 1 if (i + 1) % width else -1)
+             if 0 <= c < cells] for i in range(cells)]
+
+
+def is_solvable(state, width):
+    tiles = [t for t in state if t]
+    inv = sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
+    if width % 2:
+        return inv % 2 == 0
+    # Even widths: a move up or down shifts the blank one row and changes the inversion
+    # count by an odd amount, so the invariant is inversions plus the blank's row from the bottom.
+    row_from_bottom = width - state.index(0) // width
+    return (inv + row_from_bottom) % 2 == 1
+
+
+def neighbors(state, width):
+    idx = state.index(0)
+    moves = []
+    for nidx in adjacent(width)[idx]:
+        new_state = state.copy()
+        new_state[idx], new_state[nidx] = new_state[nidx], new_state[idx]
+        moves.append((new_state, new_state[idx]))
+    return moves
+
+
+def scramble(width, moves, rng=random):
+    state = goal(width)
+    adj = adjacent(width)
+    blank, previous = state.index(0), None
+    for _ in range(moves):
+        nidx = rng.choice([c for c in adj[blank] if c != previous])
+        state[blank], state[nidx] = state[nidx], 0
+        previous, blank = blank, nidx
+    return state
+
+
+def _longest_increasing(seq):
+    tails = []
+    for x in seq:
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if tails[mid] < x:
+                lo = mid + 1
+            else:
+                hi = mid
+        tails[lo:lo + 1] = [x]
+    return len(tails)
+
+
+def _line_conflicts(board, width, line, is_row):
+    # Tiles already in their goal line must be reordered; every tile outside the longest
+    # correctly ordered subsequence has to leave the line and come back (2 extra moves).
+    seq = []
+    for j in range(width):
+        t = board[line * width + j] if is_row else board[j * width + line]
+        if t and ((t - 1) // width if is_row else (t - 1) % width) == line:
+            seq.append((t - 1) % width if is_row else (t - 1) // width)
+    return 2 * (len(seq) - _longest_increasing(seq)) if len(seq) > 1 else 0
+
+
+def manhattan(state, width):
+    return sum(abs(i // width - (t - 1) // width) + abs(i % width - (t - 1) % width)
+               for i, t in enumerate(state) if t)
+
+
+def linear_conflict(state, width):
+    return manhattan(state, width) + sum(_line_conflicts(state, width, line, is_row)
+                                         for line in range(width) for is_row in (True, False))
+
+
+def partial_rank(positions, cells):
+    r, used = 0, 0
+    for i, p in enumerate(positions):
+        r = r * (cells - i) + p - (used & ((1 << p) - 1)).bit_count()
+        used |= 1 << p
+    return r
+
+
+def pattern_size(cells, k):
+    size = 1
+    for i in range(k):
+        size *= cells - i
+    return size
+
+
+def build_pattern(width, pattern):
+    # Counts only moves of the pattern's own tiles and lets the blank be anywhere, so the
+    # tables stay admissible and add up across disjoint patterns.
+    cells = width * width
+    adj = adjacent(width)
+    table = bytearray([UNREACHED]) * pattern_size(cells, len(pattern))
+    start = tuple(t - 1 for t in pattern)
+    table[partial_rank(start, cells)] = 0
+    queue = deque([start])
+    while queue:
+        positions = queue.popleft()
+        d = table[partial_rank(positions, cells)] + 1
+        for i, p in enumerate(positions):
+            for c in adj[p]:
+                if c in positions:
+                    continue
+                child = positions[:i] + (c,) + positions[i + 1:]
+                r = partial_rank(child, cells)
+                if table[r] == UNREACHED:
+                    table[r] = d
+                    queue.append(child)
+    return table
+
+
+def pdb_path(width):
+    return os.path.join(PDB_DIR, f'{width}x{width}.bin')
+
+
+def load_pattern_databases(width):
+    patterns = PATTERNS.get(width)
+    try:
+        f = open(pdb_path(width), 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    tables, offset = [], 0
+    for pattern in patterns:
+        size = pattern_size(width * width, len(pattern))
+        tables.append((pattern, offset))
+        offset += size
+    if offset != len(data):
+        return None
+    return data, tables
+
+
+_databases = {}
+
+
+def pattern_databases(width):
+    if width not in _databases:
+        _databases[width] = load_pattern_databases(width) if width in PATTERNS else None
+    return _databases[width]
+
+
+class _Search:
+    def __init__(self, state, width, max_nodes, time_limit):
+        self.width = width
+        self.cells = width * width
+        self.adj = adjacent(width)
+        self.board = list(state)
+        self.pos = [0] * self.cells
+        for i, t in enumerate(state):
+            self.pos[t] = i
+        self.md = manhattan(state, width)
+        self.rows = [_line_conflicts(self.board, width, r, True) for r in range(width)]
+        self.cols = [_line_conflicts(self.board, width, c, False) for c in range(width)]
+        self.lc = sum(self.rows) + sum(self.cols)
+        self.pdb = pattern_databases(width)
+        self.group_of = {}
+        self.group_h = []
+        if self.pdb:
+            data, tables = self.pdb
+            for g, (pattern, offset) in enumerate(tables):
+                for t in pattern:
+                    self.group_of[t] = g
+                self.group_h.append(self._group_value(g))
+        self.pdb_h = sum(self.group_h)
+        self.nodes = 0
+        self.max_nodes = max_nodes
+        self.deadline = time.perf_counter() + time_limit if time_limit else None
+
+    def _group_value(self, g):
+        data, tables = self.pdb
+        pattern, offset = tables[g]
+        return data[offset + partial_rank([self.pos[t] for t in pattern], self.cells)]
+
+    def h(self):
+        return max(self.md + self.lc, self.pdb_h)
+
+    def slide(self, nidx):
+        # Moves the tile at nidx into the blank and returns it; calling again with the old
+        # blank cell undoes the move.
+        w = self.width
+        blank = self.pos[0]
+        t = self.board[nidx]
+        self.board[blank], self.board[nidx] = t, 0
+        self.pos[t], self.pos[0] = blank, nidx
+        goal_r, goal_c = (t - 1) // w, (t - 1) % w
+        self.md += (abs(blank // w - goal_r) + abs(blank % w - goal_c)
+                    - abs(nidx // w - goal_r) - abs(nidx % w - goal_c))
+        if blank // w == nidx // w:
+            lines, is_row, counts = (nidx % w, blank % w), False, self.cols
+        else:
+            lines, is_row, counts = (nidx // w, blank // w), True, self.rows
+        for line in lines:
+            value = _line_conflicts(self.board, w, line, is_row)
+            self.lc += value - counts[line]
+            counts[line] = value
+        if self.pdb:
+            g = self.group_of[t]
+            value = self._group_value(g)
+            self.pdb_h += value - self.group_h[g]
+            self.group_h[g] = value
+        return t
+
+    def tick(self):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            if self.max_nodes and self.nodes >= self.max_nodes:
+                raise SolveBudgetExceeded
+            if self.deadline and time.perf_counter() >= self.deadline:
+                raise SolveBudgetExceeded
+
+    def dfs(self, g, bound, previous, path):
+        self.tick()
+        h = self.h()
+        f = g + h
+        if f > bound:
+            return f
+        if h == 0:
+            return -1
+        minimum = None
+        blank = self.pos[0]
+        for nidx in self.adj[blank]:
+            if nidx == previous:
+                continue
+            self.slide(nidx)
+            path.append(nidx)
+            t = self.dfs(g + 1, bound, blank, path)
+            if t == -1:
+                return -1
+            path.pop()
+            self.slide(blank)
+            if minimum is None or t < minimum:
+                minimum = t
+        return minimum if minimum is not None else float('inf')
+
+
+def ida_star(start, width, max_nodes=MAX_NODES, time_limit=TIME_LIMIT, stats=None, max_depth=None):
+    # max_depth stops the search once no solution of at most that length exists.
+    search = _Search(start, width, max_nodes, time_limit)
+    bound = search.h()
+    moves, iterations, found, exhausted = [], 0, False, False
+    try:
+        while bound != float('inf'):
+            if max_depth is not None and bound > max_depth:
+                exhausted = True
+                break
+            iterations += 1
+            t = search.dfs(0, bound, None, moves)
+            if t == -1:
+                found = True
+                break
+            bound = t
+    except SolveBudgetExceeded:
+        pass
+    if stats is not None:
+        stats['nodes'] = search.nodes
+        stats['iterations'] = iterations
+        stats['bound'] = bound
+        stats['complete'] = found or exhausted
+        stats['pattern_databases'] = search.pdb is not None
+    if not found:
+        return None
+    path, state = [], list(start)
+    for nidx in moves:
+        blank = state.index(0)
+        state[blank], state[nidx] = state[nidx], 0
+        path.append(state.copy())
+    return path
+
+
+def solve(state, width, max_depth=None, max_nodes=MAX_NODES, time_limit=TIME_LIMIT):
+    # Entry point for the solver pool, where a stats dict passed in would not come back.
+    stats = {}
+    path = ida_star(state, width, max_nodes, time_limit, stats, max_depth)
+    return path, stats
+
+
+def heuristic(state, width):
+    search = _Search(state, width, None, None)
+    return search.h()
+
+
+if __name__ == '__main__':
+    import sys
+    os.makedirs(PDB_DIR, exist_ok=True)
+    for width in [int(w) for w in sys.argv[1:]] or sorted(PATTERNS):
+        start = time.perf_counter()
+        with open(pdb_path(width), 'wb') as f:
+            for pattern in PATTERNS[width]:
+                f.write(build_pattern(width, pattern))
+        print(f"Wrote {pdb_path(width)} in {time.perf_counter() - start:.1f}s")
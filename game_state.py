@@ -0,0 +1,196 @@
+from flask import session
+from collections import OrderedDict
+import os, sqlite3, threading, time, uuid
+import metrics
+
+# Per-player game state for the blueprints, keyed by a player id kept in the session. Each game
+# supplies an encode/decode pair that packs its state into a few bytes, and both backends hold
+# only those bytes, so a game must put() its state back after changing it.
+# ARCADE_STATE_STORE=memory (the default) keeps an LRU with a sliding TTL in each process;
+# ARCADE_STATE_STORE=sqlite shares state between gunicorn workers through ARCADE_STATE_DB, a
+# WAL database whose pages the workers read through a shared memory map.
+
+MAX_ENTRIES = 10000
+TTL = 3600
+MMAP_SIZE = 64 * 1024 * 1024
+DB_PATH = os.environ.get(
+    "ARCADE_STATE_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "game_state.db"))
+
+
+def player_id():
+    if 'player_id' not in session:
+        session['player_id'] = uuid.uuid4().hex
+    return session['player_id']
+
+
+class _Timings:
+    # Read and write counts and cumulative seconds, for stats() and the metrics histograms.
+
+    def __init__(self, game):
+        self.game = game
+        self.reads = self.writes = 0
+        self.read_seconds = self.write_seconds = 0.0
+
+    def read(self, start):
+        elapsed = time.perf_counter() - start
+        self.reads += 1
+        self.read_seconds += elapsed
+        metrics.observe("arcade_game_state_seconds", elapsed, game=self.game, op="read")
+
+    def write(self, start):
+        elapsed = time.perf_counter() - start
+        self.writes += 1
+        self.write_seconds += elapsed
+        metrics.observe("arcade_game_state_seconds", elapsed, game=self.game, op="write")
+
+    def stats(self):
+        return {"reads": self.reads, "writes": self.writes,
+                "read_us_avg": round(self.read_seconds / self.reads * 1e6, 1) if self.reads else None,
+                "write_us_avg": round(self.write_seconds / self.writes * 1e6, 1) if self.writes else None}
+
+
+class MemoryStateStore:
+    # LRU with a sliding TTL: entries are touched on every read, so the least recently used
+    # entry is also the next one to expire.
+
+    def __init__(self, game, encode, decode, max_entries=MAX_ENTRIES, ttl=TTL):
+        self.encode, self.decode = encode, decode
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.timings = _Timings(game)
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, player):
+        start = time.perf_counter()
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(player)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self.entries[player]
+                    self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries[player] = (now + self.ttl, entry[1])
+            self.entries.move_to_end(player)
+            self.hits += 1
+        state = self.decode(entry[1])
+        self.timings.read(start)
+        return state
+
+    def put(self, player, state):
+        start = time.perf_counter()
+        data = self.encode(state)
+        now = time.monotonic()
+        with self.lock:
+            self.entries[player] = (now + self.ttl, data)
+            self.entries.move_to_end(player)
+            while self.entries:
+                oldest, (expires, _) = next(iter(self.entries.items()))
+                if expires <= now:
+                    self.expirations += 1
+                elif len(self.entries) > self.max_entries:
+                    self.evictions += 1
+                else:
+                    break
+                del self.entries[oldest]
+            self.timings.write(start)
+
+    def delete(self, player):
+        with self.lock:
+            self.entries.pop(player, None)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return dict(self.timings.stats(), backend="memory", entries=len(self.entries),
+                        bytes=sum(len(data) for expires, data in self.entries.values()),
+                        hits=self.hits, misses=self.misses,
+                        hit_rate=round(self.hits / lookups, 4) if lookups else None,
+                        evictions=self.evictions, expirations=self.expirations)
+
+
+class SqliteStateStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS game_state (
+        game TEXT, player TEXT, data BLOB, expires REAL, PRIMARY KEY (game, player)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS game_state_expires ON game_state (expires);
+    """
+
+    def __init__(self, game, encode, decode, path=DB_PATH, ttl=TTL):
+        self.game = game
+        self.encode, self.decode = encode, decode
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = None
+        self.pid = None
+        self.timings = _Timings(game)
+        self.hits = self.misses = self.expirations = 0
+
+    def _connect(self):
+        # Opened lazily and per process: a connection must not cross a gunicorn fork.
+        if self.conn is None or self.pid != os.getpid():
+            self.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+            self.conn.executescript(self.SCHEMA)
+            self.pid = os.getpid()
+        return self.conn
+
+    def get(self, player):
+        start = time.perf_counter()
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT data FROM game_state WHERE game = ? AND player = ? AND expires > ?",
+                (self.game, player, now)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            # A sliding TTL, as in the memory backend: a player still playing keeps their game.
+            conn.execute("UPDATE game_state SET expires = ? WHERE game = ? AND player = ?",
+                         (now + self.ttl, self.game, player))
+            self.hits += 1
+        state = self.decode(row[0])
+        self.timings.read(start)
+        return state
+
+    def put(self, player, state):
+        start = time.perf_counter()
+        data = self.encode(state)
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO game_state VALUES (?, ?, ?, ?)",
+                         (self.game, player, data, now + self.ttl))
+            self.expirations += conn.execute(
+                "DELETE FROM game_state WHERE game = ? AND expires <= ?", (self.game, now)).rowcount
+            self.timings.write(start)
+
+    def delete(self, player):
+        with self.lock:
+            self._connect().execute("DELETE FROM game_state WHERE game = ? AND player = ?", (self.game, player))
+
+    def stats(self):
+        with self.lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM game_state WHERE game = ? AND expires > ?",
+                (self.game, time.time())).fetchone()
+            lookups = self.hits + self.misses
+            return dict(self.timings.stats(), backend="sqlite", entries=entries, bytes=size,
+                        hits=self.hits, misses=self.misses,
+                        hit_rate=round(self.hits / lookups, 4) if lookups else None,
+                        expirations=self.expirations)
+
+
+def make_store(game, encode, decode):
+    if os.environ.get("ARCADE_STATE_STORE", "memory") == "sqlite":
+        return SqliteStateStore(game, encode, decode)
+    return MemoryStateStore(game, encode, decode)
@@ -0,0 +1,17 @@
+import gc, os
+
+# Read by `gunicorn main:app` from the repo root (see Procfile). The app is imported and warmed
+# once in the master; workers fork from it and share the read-only tables copy-on-write.
+
+chdir = os.path.dirname(os.path.abspath(__file__))
+preload_app = True
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and before any worker is forked.
+    from main import app, warm_up
+    warm_up(app)
+    # Objects built so far are never collected; freezing them keeps the collector from writing
+    # to their pages in every worker.
+    gc.freeze()
+    server.log.info("Startup: %s", app.extensions['arcade_startup'])
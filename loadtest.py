@@ -0,0 +1,194 @@
+import argparse, http.cookiejar, json, logging, math, random, sys, threading, time, urllib.error, urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# End-to-end load generator: python loadtest.py --concurrency 1 4 16 --duration 10 -o results.json
+# Each worker thread plays whole player sessions (its own cookie jar) for one game after
+# another until the level's duration is up, and every request's latency is recorded under its
+# route. Without --url the app is served in-process by werkzeug's threaded server, which
+# shares the GIL with the load threads; point --url at gunicorn to size a real deployment.
+
+SCENARIOS = ("tic_tac_toe", "eight_puzzle", "crypt_arithmetic", "word_evolver", "personality_evaluator")
+PERCENTILES = (50, 95, 99)
+TIMEOUT = 30
+
+
+class Session:
+    def __init__(self, base_url, recorder):
+        self.base_url = base_url
+        self.recorder = recorder
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def call(self, method, path, body=None, route=None):
+        # route groups requests whose paths carry query strings or ids.
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                     headers={"Content-Type": "application/json"} if data else {})
+        start = time.perf_counter()
+        try:
+            with self.opener.open(req, timeout=TIMEOUT) as response:
+                payload = response.read()
+                ok = True
+        except urllib.error.HTTPError as e:
+            payload, ok = e.read(), e.code < 500
+        except OSError:
+            payload, ok = b"", False
+        self.recorder.record(f"{method} {route or path}", time.perf_counter() - start, ok)
+        try:
+            return json.loads(payload) if ok else None
+        except ValueError:
+            return None
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, route, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(seconds)
+            if not ok:
+                self.errors[route] = self.errors.get(route, 0) + 1
+
+
+def percentile(ordered, p):
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def tic_tac_toe(s, rng):
+    board = [' '] * 9
+    lines = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+    difficulty = rng.choice(("easy", "medium", "hard"))
+    while ' ' in board and not any(board[a] != ' ' and board[a] == board[b] == board[c] for a, b, c in lines):
+        board[rng.choice([i for i, c in enumerate(board) if c == ' '])] = 'X'
+        if ' ' not in board:
+            break
+        reply = s.call("POST", "/tic-tac-toe/ai-move", {"board": board, "difficulty": difficulty})
+        if not reply or reply.get("move") is None:
+            break
+        board[reply["move"]] = 'O'
+
+
+def eight_puzzle(s, rng):
+    reply = s.call("POST", "/8-puzzle/shuffle", {"size": 3})
+    if not reply:
+        return
+    state = reply["state"]
+    for _ in range(rng.randint(5, 20)):
+        if rng.random() < 0.5:
+            reply = s.call("GET", "/8-puzzle/hint")
+        else:
+            blank = state.index(0)
+            neighbours = [i for i in (blank - 3, blank + 3, blank - 1, blank + 1)
+                          if 0 <= i < 9 and (i // 3 == blank // 3 or i % 3 == blank % 3)]
+            reply = s.call("POST", "/8-puzzle/move", {"tile": state[rng.choice(neighbours)]})
+        if not reply or reply.get("done") or "state" not in reply:
+            break
+        state = reply["state"]
+
+
+def crypt_arithmetic(s, rng):
+    reply = s.call("POST", "/crypt-arithmetic/get-puzzle", {"difficulty": rng.choice(("easy", "medium", "hard"))})
+    if not reply or "letters" not in reply:
+        return
+    for letter in reply["letters"]:
+        s.call("POST", "/crypt-arithmetic/check-letter", {"letter": letter, "digit": rng.randint(0, 9)})
+    s.call("GET", "/crypt-arithmetic/get-hint")
+
+
+def word_evolver(s, rng):
+    target = rng.choice(("HELLO WORLD", "GENETIC ALGORITHMS", "TO BE OR NOT TO BE"))
+    if not s.call("POST", "/start", {"target": target}):
+        return
+    for _ in range(rng.randint(5, 30)):
+        reply = s.call("GET", "/next-generation?debug=1", route="/next-generation")
+        if not reply or reply.get("done"):
+            break
+
+
+def personality_evaluator(s, rng):
+    s.call("POST", "/personality-evaluator/predict", {"answers": [rng.randint(0, 1) for _ in range(20)]})
+
+
+def worker(base_url, scenarios, recorder, deadline, seed):
+    rng = random.Random(seed)
+    sessions = 0
+    while time.perf_counter() < deadline:
+        scenario = scenarios[sessions % len(scenarios)]
+        globals()[scenario](Session(base_url, recorder), rng)
+        sessions += 1
+    return sessions
+
+
+def run_level(base_url, scenarios, concurrency, duration, seed):
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        sessions = sum(pool.map(lambda i: worker(base_url, scenarios, recorder, deadline, seed * 1000 + i),
+                                range(concurrency)))
+    elapsed = time.perf_counter() - start
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        ordered = sorted(latencies)
+        routes[route] = {"count": len(ordered), "errors": recorder.errors.get(route, 0),
+                         "rps": round(len(ordered) / elapsed, 2),
+                         **{f"p{p}_ms": round(percentile(ordered, p) * 1000, 2) for p in PERCENTILES},
+                         "max_ms": round(ordered[-1] * 1000, 2)}
+    requests = sum(r["count"] for r in routes.values())
+    return {"concurrency": concurrency, "elapsed_s": round(elapsed, 2), "sessions": sessions,
+            "requests": requests, "errors": sum(r["errors"] for r in routes.values()),
+            "throughput_rps": round(requests / elapsed, 2), "routes": routes}
+
+
+def serve_locally():
+    from werkzeug.serving import make_server
+    from main import app, warm_up
+    warm_up(app)
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent end-to-end load test of the arcade.")
+    parser.add_argument("--url", help="base URL of a running server; default serves the app in-process")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url.rstrip("/") if args.url else None
+    if base_url is None:
+        server, base_url = serve_locally()
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            level = run_level(base_url, args.scenarios, concurrency, args.duration, args.seed)
+            levels.append(level)
+            print(f"concurrency {concurrency}: {level['throughput_rps']} req/s, {level['errors']} errors",
+                  file=sys.stderr)
+            for route, r in level["routes"].items():
+                print(f"  {route:45} {r['count']:6} p50 {r['p50_ms']:8.2f}ms p95 {r['p95_ms']:8.2f}ms "
+                      f"p99 {r['p99_ms']:8.2f}ms", file=sys.stderr)
+    finally:
+        if server:
+            server.shutdown()
+
+    report = {"config": {"url": args.url or "in-process", "duration_s": args.duration,
+                         "scenarios": args.scenarios, "seed": args.seed},
+              "levels": levels}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
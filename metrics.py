@@ -0,0 +1,209 @@
+from flask import g, jsonify, request
+from bisect import bisect_left
+import cProfile, os, re, threading, time
+import solver_pool
+
+# Request and solver instrumentation, off unless ARCADE_METRICS=1. When on, every request is
+# counted and timed by route, the engines report their work through record_solver(), count()
+# and observe(), and GET /metrics serves it all in the Prometheus text format to loopback
+# clients, along with the solver pool's queue depth and job outcomes. Counters live in each
+# process, so every gunicorn worker reports its own.
+# ARCADE_PROFILE_SLOW_MS=N runs each request under cProfile and writes the stats of those
+# slower than N ms to ARCADE_PROFILE_DIR, for `python -m pstats` or snakeviz.
+
+ENABLED = os.environ.get('ARCADE_METRICS', '') not in ('', '0')
+PROFILE_SLOW_MS = float(os.environ.get('ARCADE_PROFILE_SLOW_MS', 0))
+PROFILE_DIR = os.environ.get(
+    'ARCADE_PROFILE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
+LOCAL_ADDRS = ('127.0.0.1', '::1')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000)
+STORE_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+
+METRICS = {
+    "arcade_requests_total": ("counter", "HTTP requests by route, method and status.", None),
+    "arcade_request_duration_seconds": ("histogram", "HTTP request latency by route.", LATENCY_BUCKETS),
+    "arcade_solver_calls_total": ("counter", "Solver invocations.", None),
+    "arcade_solver_nodes_total": ("counter", "Nodes searched: minimax and IDA* nodes, A* expansions, "
+                                             "crypt backtracking nodes or vectorized candidates.", None),
+    "arcade_solver_seconds": ("histogram", "Solver wall time.", LATENCY_BUCKETS),
+    "arcade_solver_peak_open": ("histogram", "Peak open-list size of A* searches.", SIZE_BUCKETS),
+    "arcade_ga_generations_total": ("counter", "Word evolver generations evolved.", None),
+    "arcade_ga_fitness_evaluations_total": ("counter", "Word evolver fitness evaluations.", None),
+    "arcade_model_inference_seconds": ("histogram", "Personality model inference time per call.", LATENCY_BUCKETS),
+    "arcade_model_rows_total": ("counter", "Answer rows scored by the personality model.", None),
+    "arcade_game_state_seconds": ("histogram", "Game state store reads and writes, by game.", STORE_BUCKETS),
+    "arcade_slow_request_profiles_total": ("counter", "cProfile dumps written for slow requests.", None),
+}
+
+POOL_EVENTS = ("submitted", "completed", "failed", "timeouts", "rejected", "cancelled")
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def count(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, value, **labels):
+    if not ENABLED:
+        return
+    buckets = METRICS[name][2]
+    key = _key(name, labels)
+    with _lock:
+        # Per-bucket counts, then the sum and the count; render() makes the buckets cumulative.
+        series = _histograms.get(key)
+        if series is None:
+            series = _histograms[key] = [0] * (len(buckets) + 3)
+        series[bisect_left(buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+def record_solver(solver, stats, seconds=None):
+    # stats is the dict an engine filled in; A* reports nodes_expanded, the others nodes.
+    if not ENABLED or not stats:
+        return
+    count("arcade_solver_calls_total", solver=solver)
+    count("arcade_solver_nodes_total", stats.get("nodes", stats.get("nodes_expanded", 0)), solver=solver)
+    if "peak_open" in stats:
+        observe("arcade_solver_peak_open", stats["peak_open"], solver=solver)
+    if seconds is not None:
+        observe("arcade_solver_seconds", seconds, solver=solver)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _number(value):
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def render():
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((key, list(series)) for key, series in _histograms.items())
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        if kind == "counter":
+            lines += [f"{name}{_labels(pairs)} {_number(v)}" for (n, pairs), v in counters if n == name]
+            continue
+        for (n, pairs), series in histograms:
+            if n != name:
+                continue
+            cumulative = 0
+            for bound, hits in zip(buckets + ('+Inf',), series):
+                cumulative += hits
+                lines.append(f"{name}_bucket{_labels(pairs + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(pairs)} {_number(series[-2])}")
+            lines.append(f"{name}_count{_labels(pairs)} {series[-1]}")
+    return '\n'.join(lines + render_pool()) + '\n'
+
+
+def render_pool():
+    # Read from solver_pool.stats() at scrape time rather than mirrored into _counters.
+    pool = solver_pool.stats()
+    return [
+        "# HELP arcade_solver_pool_queue_depth Solver pool jobs submitted and not yet finished.",
+        "# TYPE arcade_solver_pool_queue_depth gauge",
+        f"arcade_solver_pool_queue_depth {pool['queue_depth']}",
+        "# HELP arcade_solver_pool_max_pending Solver pool queue limit; submissions beyond it are rejected.",
+        "# TYPE arcade_solver_pool_max_pending gauge",
+        f"arcade_solver_pool_max_pending {pool['max_pending']}",
+        "# HELP arcade_solver_pool_jobs_total Solver pool jobs by event.",
+        "# TYPE arcade_solver_pool_jobs_total counter",
+    ] + [f"arcade_solver_pool_jobs_total{_labels((('event', e),))} {pool[e]}" for e in POOL_EVENTS]
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def route_label():
+    # The URL rule, not the path, so ids and query strings do not multiply the series.
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def start_request():
+    g.metrics_start = time.perf_counter()
+    g.profiler = None
+    if PROFILE_SLOW_MS:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            g.profiler = profiler
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; concurrent requests go unprofiled.
+            pass
+
+
+def finish_request(response):
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    route, method, status = route_label(), request.method, str(response.status_code)
+    profiler = g.pop('profiler', None)
+
+    def record():
+        elapsed = time.perf_counter() - start
+        count("arcade_requests_total", route=route, method=method, status=status)
+        observe("arcade_request_duration_seconds", elapsed, route=route, method=method)
+        if profiler is not None:
+            profiler.disable()
+            if elapsed * 1000 >= PROFILE_SLOW_MS:
+                dump_profile(profiler, route, elapsed)
+
+    # Recorded once the server has sent the body, so streamed responses are timed in full.
+    # send_file hands its file straight to the server, and werkzeug never closes such a
+    # response, so those are recorded here.
+    if response.direct_passthrough:
+        record()
+    else:
+        response.call_on_close(record)
+    return response
+
+
+def dump_profile(profiler, route, elapsed):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{slug}-{round(elapsed * 1000)}ms.prof"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+    count("arcade_slow_request_profiles_total", route=route)
+
+
+def metrics_view():
+    if request.remote_addr not in LOCAL_ADDRS:
+        return jsonify({"error": "Not found"}), 404
+    return render(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+
+def install(app):
+    # With neither option set nothing is registered and the engines' calls return at once.
+    if not (ENABLED or PROFILE_SLOW_MS):
+        return
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    if ENABLED:
+        app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,13 +1,64 @@
-from flask import Blueprint, request, jsonify, render_template
-import joblib
-import numpy as np
+from flask import Blueprint, Response, current_app, request, jsonify, render_template
+import os, threading, time
+import metrics
+from .model import ANSWER_COUNT, MODEL_PATH, TraitModel, answer_matrix, score_rows
+from .response_table import ResponseTable
 
 personality_evaluator = Blueprint('personality_evaluator', __name__, template_folder='templates')
 
-trait_codes = ["EI", "SN", "TF", "JP"]
-models = {}
-for code in trait_codes:
-    models[code] = joblib.load(f"personality_evaluator/personality_model_{code}.pkl")
+MAX_BATCH_SIZE = 10000
+RELOAD_INTERVAL = 1.0
+
+_model = None
+_model_mtime = None
+_checked = 0.0
+_table = None
+_lock = threading.Lock()
+
+
+def get_model():
+    # Loaded on first use, so the training scripts can import this package before the file
+    # exists. Afterwards the artifact's mtime is checked at most once per RELOAD_INTERVAL and a
+    # retrained file is swapped in; one that fails to load leaves the current model serving.
+    global _model, _model_mtime, _checked
+    now = time.monotonic()
+    if _model is not None and now - _checked < RELOAD_INTERVAL:
+        return _model
+    with _lock:
+        _checked = now
+        try:
+            mtime = os.stat(MODEL_PATH).st_mtime_ns
+        except OSError:
+            mtime = _model_mtime
+        if _model is None or mtime != _model_mtime:
+            try:
+                _model = TraitModel.load()
+                _model_mtime = mtime
+            except (OSError, ValueError, KeyError):
+                if _model is None:
+                    raise
+    return _model
+
+
+def get_table():
+    global _table
+    model = get_model()
+    if _table is None or _table.model is not model:
+        _table = ResponseTable(model, recommendations, FALLBACK_RECOMMENDATION)
+    return _table
+
+
+def warm_up():
+    get_table()
+
+
+def infer(answers):
+    start = time.perf_counter()
+    results = score_rows(get_model(), answers)
+    metrics.observe("arcade_model_inference_seconds", time.perf_counter() - start)
+    metrics.count("arcade_model_rows_total", len(answers))
+    return results
+
 
 recommendations = {
     "INTJ": {
@@ -108,6 +159,13 @@ recommendations = {
     }
 }
 
+FALLBACK_RECOMMENDATION = {
+    "careers": ["N/A"],
+    "traits": "Unique mix!",
+    "description": "No specific description available.",
+    "full_form": "No title available."
+}
+
 
 @personality_evaluator.route('/personality-evaluator')
 def home():
@@ -118,26 +176,19 @@ def predict():
     data = request.get_json()
     answers = data.get("answers")
 
-    if not answers or len(answers) != 20:
+    if not answers or len(answers) != ANSWER_COUNT:
         return jsonify({"error": "Please provide all the answers."}), 400
 
-    result = ""
-    confidence = []
-
-    for i, code in enumerate(trait_codes):
-        model = models[code]
-        input_data = np.array([answers[i*5:(i+1)*5]])
-        pred = model.predict(input_data)[0]
-        prob = model.predict_proba(input_data)[0][pred]
-        result += code[pred]
-        confidence.append(round(prob * 100, 2))
-
-    rec = recommendations.get(result, {
-        "careers": ["N/A"],
-        "traits": "Unique mix!",
-        "description": "No specific description available.",
-        "full_form": "No title available."
-    })
+    body = get_table().lookup(answers)
+    if body is not None:
+        return Response(body, mimetype="application/json")
+
+    try:
+        [(result, confidence)] = infer(answer_matrix([answers]))
+    except ValueError:
+        return jsonify({"error": "Answers must be numbers."}), 400
+
+    rec = recommendations.get(result, FALLBACK_RECOMMENDATION)
 
     return jsonify({
         "mbti": result,
@@ -147,3 +198,31 @@ def predict():
         "description": rec["description"],
         "full_form": rec["full_form"]
     })
+
+@personality_evaluator.route('/personality-evaluator/predict-batch', methods=['POST'])
+def predict_batch():
+    start = time.perf_counter()
+    data = request.get_json(silent=True)
+    rows = data.get("answers", []) if isinstance(data, dict) else None
+    max_batch = current_app.config.get('PERSONALITY_MAX_BATCH', MAX_BATCH_SIZE)
+    if not isinstance(rows, list):
+        return jsonify({"error": "answers must be a list of answer lists."}), 400
+    if len(rows) > max_batch:
+        return jsonify({"error": f"Batch size {len(rows)} exceeds the limit of {max_batch}"}), 413
+    try:
+        answers = answer_matrix(rows)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    results = [{"mbti": t, "confidence": c} for t, c in infer(answers)]
+    elapsed = time.perf_counter() - start
+    return jsonify({
+        "results": results,
+        "count": len(results),
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "rows_per_sec": round(len(results) / elapsed) if elapsed else None
+    })
+
+@personality_evaluator.route('/personality-evaluator/model')
+def model_info():
+    return jsonify(get_model().metadata)
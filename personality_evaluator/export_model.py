@@ -0,0 +1,56 @@
+import itertools, os
+import joblib
+import numpy as np
+
+from .model import ANSWERS_PER_TRAIT, MODEL_PATH, TRAIT_CODES, TraitModel, block_weights, save_model
+
+# Exports the pickled per-trait models into personality_model.npz and checks that the fused
+# numpy path reproduces them: python -m personality_evaluator.export_model
+
+PICKLE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_pickles(directory=PICKLE_DIR):
+    return [joblib.load(os.path.join(directory, f"personality_model_{code}.pkl")) for code in TRAIT_CODES]
+
+
+def export(models, path=MODEL_PATH):
+    for model in models:
+        if list(model.classes_) != [0, 1]:
+            raise ValueError(f"Expected classes [0, 1], got {model.classes_}")
+    coef = np.vstack([model.coef_[0] for model in models])
+    intercept = np.array([model.intercept_[0] for model in models])
+    weights = block_weights(coef)
+    metadata = save_model(path, weights, intercept, {"source": "export_model"})
+    return TraitModel(weights, intercept, metadata)
+
+
+def check_equivalence(models, fused, samples=2000, seed=0):
+    # Every binary answer combination per trait, plus random off-scale answers.
+    combos = np.array(list(itertools.product((0, 1), repeat=ANSWERS_PER_TRAIT)), dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    per_trait = np.vstack([combos, rng.uniform(-2, 3, (samples, ANSWERS_PER_TRAIT))])
+    answers = np.hstack([per_trait] * len(models))
+    labels, confidence = fused.predict(answers)
+    max_diff = 0.0
+    for i, model in enumerate(models):
+        x = answers[:, i * ANSWERS_PER_TRAIT:(i + 1) * ANSWERS_PER_TRAIT]
+        expected = model.predict(x)
+        proba = model.predict_proba(x)[np.arange(len(x)), expected]
+        if not np.array_equal(expected, labels[:, i]):
+            raise AssertionError(f"{TRAIT_CODES[i]}: predictions differ")
+        if not np.array_equal(np.round(proba * 100, 2), np.round(confidence[:, i] * 100, 2)):
+            raise AssertionError(f"{TRAIT_CODES[i]}: rounded confidences differ")
+        max_diff = max(max_diff, float(np.abs(proba - confidence[:, i]).max()))
+    return len(answers), max_diff
+
+
+def main():
+    models = load_pickles()
+    fused = export(models)
+    rows, max_diff = check_equivalence(models, fused)
+    print(f"Wrote {MODEL_PATH}; {rows} inputs match the pickled models (max probability difference {max_diff:.2e})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import hashlib, itertools, json, os, time
+import numpy as np
+
+# The four per-trait logistic regressions stacked into one (4, 20) block-diagonal weight matrix:
+# trait i only sees answers 5i..5i+4, so all four decisions are a single matrix product and the
+# web process needs numpy only. The weights are written by train_model.py (or export_model.py
+# for the original pickles) as one .npz artifact carrying JSON metadata and a SHA-256 checksum
+# of the weights; loading refuses an artifact whose checksum does not match.
+
+TRAIT_CODES = ("EI", "SN", "TF", "JP")
+ANSWERS_PER_TRAIT = 5
+ANSWER_COUNT = len(TRAIT_CODES) * ANSWERS_PER_TRAIT
+MODEL_PATH = os.environ.get(
+    "PERSONALITY_MODEL_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "personality_model.npz"))
+ARTIFACT_FORMAT = 1
+
+
+def block_weights(coef):
+    weights = np.zeros((len(coef), len(coef) * coef.shape[1]))
+    for i, row in enumerate(coef):
+        weights[i, i * coef.shape[1]:(i + 1) * coef.shape[1]] = row
+    return weights
+
+
+def checksum(weights, intercept):
+    digest = hashlib.sha256()
+    for array in (weights, intercept):
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def save_model(path, weights, intercept, metadata):
+    # Written beside the target and renamed into place, so a reloading worker never sees half a file.
+    metadata = dict(metadata, format=ARTIFACT_FORMAT, checksum=checksum(weights, intercept),
+                    traits=list(TRAIT_CODES), created=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+    metadata.setdefault("version", time.strftime("%Y%m%d%H%M%S", time.gmtime()))
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, weights=weights, intercept=intercept, metadata=np.array(json.dumps(metadata)))
+    os.replace(tmp, path)
+    return metadata
+
+
+class TraitModel:
+    def __init__(self, weights, intercept, metadata=None):
+        self.weights = weights
+        self.intercept = intercept
+        self.metadata = metadata or {}
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as data:
+            weights, intercept = data["weights"], data["intercept"]
+            metadata = json.loads(str(data["metadata"])) if "metadata" in data else {}
+        if metadata.get("format", ARTIFACT_FORMAT) != ARTIFACT_FORMAT:
+            raise ValueError(f"Unsupported model format {metadata['format']}")
+        if "checksum" in metadata and metadata["checksum"] != checksum(weights, intercept):
+            raise ValueError(f"Checksum mismatch in {path}")
+        if weights.shape != (len(TRAIT_CODES), ANSWER_COUNT) or intercept.shape != (len(TRAIT_CODES),):
+            raise ValueError(f"Unexpected weight shapes in {path}")
+        return cls(weights, intercept, metadata)
+
+    def predict(self, answers):
+        # answers: (n, 20). Returns the chosen class per trait (1 picks the second letter of the
+        # trait code) and the probability of that class, as LogisticRegression.predict_proba gives it.
+        decision = np.asarray(answers, dtype=np.float64) @ self.weights.T + self.intercept
+        labels = (decision > 0).astype(np.int64)
+        positive = 1.0 / (1.0 + np.exp(-decision))
+        return labels, np.where(labels == 1, positive, 1.0 - positive)
+
+
+def mbti(labels):
+    return ''.join(code[label] for code, label in zip(TRAIT_CODES, labels))
+
+
+# All 16 types, indexed by the trait labels read as a binary number (EI label is the high bit).
+TYPES = [mbti(labels) for labels in itertools.product((0, 1), repeat=len(TRAIT_CODES))]
+TYPE_BITS = 1 << np.arange(len(TRAIT_CODES))[::-1]
+
+
+def answer_matrix(rows):
+    # Raises ValueError naming the first malformed row.
+    for i, row in enumerate(rows):
+        if not isinstance(row, (list, tuple)) or len(row) != ANSWER_COUNT:
+            raise ValueError(f"Row {i}: expected {ANSWER_COUNT} answers")
+    try:
+        matrix = np.array(rows, dtype=np.float64).reshape(len(rows), ANSWER_COUNT)
+    except (TypeError, ValueError):
+        raise ValueError("Answers must be numbers")
+    # None becomes NaN in a float array. Finite answers off the 0/1 scale are still scored.
+    bad = np.flatnonzero(~np.isfinite(matrix).all(axis=1))
+    if bad.size:
+        raise ValueError(f"Row {bad[0]}: answers must be finite numbers")
+    return matrix
+
+
+def score_rows(model, answers):
+    # One vectorized pass over a chunk; confidences are percentages as the web endpoint shows them.
+    labels, probs = model.predict(answers)
+    types = (labels @ TYPE_BITS).tolist()
+    return [(TYPES[t], [round(p * 100, 2) for p in row]) for t, row in zip(types, probs.tolist())]
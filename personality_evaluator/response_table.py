@@ -0,0 +1,49 @@
+import itertools, json
+import numpy as np
+
+from .model import ANSWERS_PER_TRAIT, ANSWER_COUNT, TRAIT_CODES, TYPES
+
+# Finished /predict responses for the Yes/No answer scale the quiz uses. Each trait only sees
+# its own 5 answers, so there are 32 outcomes per trait: the table holds each outcome's label
+# and serialized confidence, plus one serialized body tail per MBTI type, and a response is
+# stitched from four lookups. Enumerating all 2**20 answer vectors would cost hundreds of MB
+# for the same bytes. Answers off the 0/1 scale are not in the table; callers fall back to the
+# model for those.
+
+SCALE = (0, 1)
+
+
+def answer_combos():
+    return np.array(list(itertools.product(SCALE, repeat=ANSWERS_PER_TRAIT)), dtype=np.float64)
+
+
+class ResponseTable:
+    def __init__(self, model, recommendations, fallback):
+        self.model = model
+        combos = answer_combos()
+        answers = np.zeros((len(combos), ANSWER_COUNT))
+        for i in range(len(TRAIT_CODES)):
+            answers[:, i * ANSWERS_PER_TRAIT:(i + 1) * ANSWERS_PER_TRAIT] = combos
+        labels, probs = model.predict(answers)
+        self.labels = labels.T.tolist()
+        self.confidence = [[json.dumps(round(p * 100, 2)) for p in row] for row in probs.T.tolist()]
+        self.tails = []
+        for mbti in TYPES:
+            rec = recommendations.get(mbti, fallback)
+            fields = {key: rec[key] for key in ("careers", "traits", "description", "full_form")}
+            self.tails.append(json.dumps(fields, ensure_ascii=False)[1:])
+
+    def lookup(self, answers):
+        # Returns the response body as bytes, or None for answers outside SCALE.
+        if not isinstance(answers, list) or len(answers) != ANSWER_COUNT or not all(type(a) is int and a in SCALE for a in answers):
+            return None
+        index = 0
+        confidence = []
+        for i in range(len(TRAIT_CODES)):
+            outcome = 0
+            for a in answers[i * ANSWERS_PER_TRAIT:(i + 1) * ANSWERS_PER_TRAIT]:
+                outcome = outcome * 2 + a
+            index = index * 2 + self.labels[i][outcome]
+            confidence.append(self.confidence[i][outcome])
+        return (f'{{"mbti":"{TYPES[index]}","confidence":[{",".join(confidence)}],'
+                + self.tails[index]).encode()
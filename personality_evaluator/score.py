@@ -0,0 +1,132 @@
+import argparse, csv, itertools, json, math, sys, time
+
+from .model import ANSWER_COUNT, MODEL_PATH, TRAIT_CODES, TraitModel, answer_matrix, score_rows
+
+# Offline bulk scoring: python -m personality_evaluator.score answers.csv -o scored.csv
+# CSV input needs a header with answer columns q1..q20; JSONL input needs an "answers" list per
+# line. Every other column or key is copied through, and each row gains its MBTI type and
+# per-trait confidences. Input is read and scored CHUNK_SIZE rows at a time, so memory stays
+# bounded whatever the file size. Rows that cannot be scored, including JSONL lines that do not
+# parse, keep an "error" field instead.
+
+CHUNK_SIZE = 10000
+ANSWER_COLUMNS = [f"q{i}" for i in range(1, ANSWER_COUNT + 1)]
+CONFIDENCE_COLUMNS = [f"confidence_{code}" for code in TRAIT_CODES]
+INVALID = "Expected 20 numeric answers"
+MALFORMED = "Malformed JSON line"
+
+
+def numeric(answers):
+    # Checked per row, so one bad row does not make answer_matrix reject its whole chunk.
+    try:
+        values = [float(a) for a in answers]
+    except (TypeError, ValueError):
+        return None
+    return values if all(math.isfinite(v) for v in values) else None
+
+
+def read_rows(f, fmt):
+    # Yields (record, answers) pairs; answers is None when the row is malformed. A JSONL line
+    # that does not parse yields its line number, with the error to report, as the record.
+    if fmt == "csv":
+        reader = csv.DictReader(f)
+        missing = [c for c in ANSWER_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV input is missing columns: {', '.join(missing)}")
+        for row in reader:
+            yield row, numeric([row.pop(c) for c in ANSWER_COLUMNS])
+    else:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                yield {"line": number, "error": MALFORMED}, None
+                continue
+            answers = record.pop("answers", None)
+            valid = isinstance(answers, list) and len(answers) == ANSWER_COUNT
+            yield record, numeric(answers) if valid else None
+
+
+def score_chunk(model, chunk):
+    scored = iter(score_rows(model, answer_matrix([a for r, a in chunk if a is not None])))
+    for record, answers in chunk:
+        yield record, None if answers is None else next(scored)
+
+
+class Writer:
+    def __init__(self, f, fmt):
+        self.f = f
+        self.fmt = fmt
+        self.csv = None
+
+    def write(self, record, result):
+        if self.fmt == "jsonl":
+            out = dict(record)
+            if result is None:
+                out.setdefault("error", INVALID)
+            else:
+                out["mbti"], out["confidence"] = result
+            self.f.write(json.dumps(out) + "\n")
+            return
+        if self.csv is None:
+            fields = [f for f in record if f != "error"] + ["mbti"] + CONFIDENCE_COLUMNS + ["error"]
+            self.csv = csv.DictWriter(self.f, fieldnames=fields, extrasaction="ignore")
+            self.csv.writeheader()
+        if result is None:
+            self.csv.writerow(dict(record, error=record.get("error", INVALID)))
+        else:
+            self.csv.writerow(dict(record, mbti=result[0], **dict(zip(CONFIDENCE_COLUMNS, result[1]))))
+
+
+def detect_format(path, default="jsonl"):
+    if path and path.endswith(".csv"):
+        return "csv"
+    if path and (path.endswith(".jsonl") or path.endswith(".json")):
+        return "jsonl"
+    return default
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score questionnaire answers in bulk.")
+    parser.add_argument("input", help="CSV or JSONL file, or - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="CSV or JSONL file, or - for stdout")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--output-format", choices=("csv", "jsonl"))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    in_fmt = args.input_format or detect_format(args.input)
+    out_fmt = args.output_format or detect_format(args.output, in_fmt)
+    model = TraitModel.load(args.model)
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    writer = Writer(sink, out_fmt)
+    rows = errors = 0
+    start = time.perf_counter()
+    try:
+        pending = read_rows(source, in_fmt)
+        while True:
+            chunk = list(itertools.islice(pending, args.chunk_size))
+            if not chunk:
+                break
+            for record, result in score_chunk(model, chunk):
+                writer.write(record, result)
+                errors += result is None
+            rows += len(chunk)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    elapsed = time.perf_counter() - start
+    print(f"{rows} rows ({errors} invalid) in {elapsed:.2f}s, {rows / elapsed:.0f} rows/s",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
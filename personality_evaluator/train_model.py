@@ -1,32 +1,70 @@
-import random
+import argparse, json
 import numpy as np
 from sklearn.linear_model import LogisticRegression
-import joblib
+
+from .model import ANSWERS_PER_TRAIT, MODEL_PATH, TRAIT_CODES, TraitModel, block_weights, save_model
+
+# Trains the four trait models and writes the single artifact the blueprint serves:
+# python -m personality_evaluator.train_model --samples 500 --seed 0
+# Running workers pick the new file up on their next request, no restart needed.
 
 NUM_SAMPLES = 500
+TEST_FRACTION = 0.2
+
+
+def generate_trait_data(rng, samples):
+    # Yes/No answers for every trait at once; a trait is labelled 1 when at least two of its
+    # five answers are 1.
+    X = rng.integers(0, 2, (samples, len(TRAIT_CODES), ANSWERS_PER_TRAIT))
+    y = (X.sum(axis=2) >= 2).astype(np.int64)
+    return X, y
+
+
+def split(X, y, rng, test_fraction):
+    order = rng.permutation(len(X))
+    cut = len(X) - max(1, int(len(X) * test_fraction))
+    return X[order[:cut]], y[order[:cut]], X[order[cut:]], y[order[cut:]]
+
+
+def evaluate(model, X, y):
+    labels, probs = model.predict(X.reshape(len(X), -1))
+    positive = np.where(labels == 1, probs, 1.0 - probs).clip(1e-15, 1 - 1e-15)
+    log_loss = -(y * np.log(positive) + (1 - y) * np.log(1 - positive)).mean(axis=0)
+    metrics = {code: {"accuracy": round(float((labels[:, i] == y[:, i]).mean()), 4),
+                      "log_loss": round(float(log_loss[i]), 4)}
+               for i, code in enumerate(TRAIT_CODES)}
+    metrics["type_accuracy"] = round(float((labels == y).all(axis=1).mean()), 4)
+    return metrics
+
+
+def train(samples=NUM_SAMPLES, seed=0, test_fraction=TEST_FRACTION):
+    rng = np.random.default_rng(seed)
+    X, y = generate_trait_data(rng, samples)
+    X_train, y_train, X_test, y_test = split(X, y, rng, test_fraction)
+    coef, intercept = [], []
+    for i in range(len(TRAIT_CODES)):
+        fitted = LogisticRegression().fit(X_train[:, i], y_train[:, i])
+        coef.append(fitted.coef_[0])
+        intercept.append(fitted.intercept_[0])
+    model = TraitModel(block_weights(np.array(coef)), np.array(intercept))
+    return model, {"train": evaluate(model, X_train, y_train), "test": evaluate(model, X_test, y_test)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the personality trait models.")
+    parser.add_argument("--samples", type=int, default=NUM_SAMPLES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--test-fraction", type=float, default=TEST_FRACTION)
+    parser.add_argument("-o", "--output", default=MODEL_PATH)
+    args = parser.parse_args()
+
+    model, metrics = train(args.samples, args.seed, args.test_fraction)
+    metadata = save_model(args.output, model.weights, model.intercept, {
+        "source": "train_model", "seed": args.seed, "samples": args.samples,
+        "test_fraction": args.test_fraction, "metrics": metrics})
+    print(json.dumps(metrics["test"], indent=2))
+    print(f"Wrote model version {metadata['version']} to {args.output} (sha256 {metadata['checksum'][:12]})")
+
 
-traits = {
-    "EI": ("E", "I"),
-    "SN": ("S", "N"),
-    "TF": ("T", "F"),
-    "JP": ("J", "P")
-}
-
-def generate_trait_data():
-    data = {}
-    for trait_code, (pos_label, neg_label) in traits.items():
-        X, y = [], []
-        for _ in range(NUM_SAMPLES):
-            answers = [random.randint(0, 1) for _ in range(5)]
-            X.append(answers)
-            label = 1 if sum(answers) >= 2 else 0
-            y.append(label)
-        data[trait_code] = (np.array(X), np.array(y))
-    return data
-
-all_data = generate_trait_data()
-for trait_code, (X, y) in all_data.items():
-    model = LogisticRegression()
-    model.fit(X, y)
-    joblib.dump(model, f"personality_model_{trait_code}.pkl")
-    print(f"Trained and saved model for {trait_code} ({traits[trait_code][0]}/{traits[trait_code][1]})")
+if __name__ == "__main__":
+    main()
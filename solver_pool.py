@@ -0,0 +1,157 @@
+from flask import Blueprint, jsonify
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+import os, pickle, signal, threading, time, uuid
+
+# Runs user-submitted solver work in a small process pool so a pathological input cannot pin
+# a web worker. run() waits at most the deadline in wall time, queueing included, then gives up
+# with SolverTimeout. Inside the pool process an ITIMER_PROF timer stops a job once it has used
+# the deadline in CPU time, which covers pickling its result; a result larger than
+# MAX_RESULT_BYTES fails the job instead of being sent back.
+
+solver_jobs = Blueprint('solver_jobs', __name__)
+
+MAX_WORKERS = int(os.environ.get('SOLVER_WORKERS', 2))
+MAX_PENDING = int(os.environ.get('SOLVER_MAX_PENDING', 16))
+DEADLINE = 2.0
+MAX_RESULT_BYTES = 4 * 1024 * 1024
+MAX_JOBS = 1000
+JOB_TTL = 600
+
+
+class SolverTimeout(Exception):
+    pass
+
+
+class SolverBusy(Exception):
+    pass
+
+
+class SolverResultTooLarge(Exception):
+    pass
+
+
+def _on_deadline(signum, frame):
+    raise SolverTimeout
+
+
+def _run_with_deadline(fn, args, kwargs, deadline):
+    signal.signal(signal.SIGPROF, _on_deadline)
+    signal.setitimer(signal.ITIMER_PROF, deadline)
+    try:
+        result = pickle.dumps(fn(*args, **kwargs), pickle.HIGHEST_PROTOCOL)
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+    if len(result) > MAX_RESULT_BYTES:
+        raise SolverResultTooLarge(f"Result of {len(result)} bytes exceeds {MAX_RESULT_BYTES}")
+    return result
+
+
+_pool = None
+_pool_pid = None
+_lock = threading.Lock()
+_pending = 0
+counters = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "rejected": 0, "cancelled": 0}
+jobs = {}
+
+
+def _executor():
+    # Created lazily and per process, so forked web workers never share a parent's pool.
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+        _pool_pid = os.getpid()
+    return _pool
+
+
+def _finished(future):
+    global _pending
+    with _lock:
+        _pending -= 1
+        if future.cancelled():
+            counters["cancelled"] += 1
+        elif isinstance(future.exception(), SolverTimeout):
+            counters["timeouts"] += 1
+        elif future.exception() is not None:
+            counters["failed"] += 1
+        else:
+            counters["completed"] += 1
+
+
+def submit(fn, *args, deadline=DEADLINE, **kwargs):
+    global _pending
+    with _lock:
+        if _pending >= MAX_PENDING:
+            counters["rejected"] += 1
+            raise SolverBusy
+        _pending += 1
+        counters["submitted"] += 1
+        try:
+            future = _executor().submit(_run_with_deadline, fn, args, kwargs, deadline)
+        except Exception:
+            _pending -= 1
+            raise
+    future.add_done_callback(_finished)
+    return future
+
+
+def run(fn, *args, deadline=DEADLINE, **kwargs):
+    future = submit(fn, *args, deadline=deadline, **kwargs)
+    try:
+        return pickle.loads(future.result(timeout=deadline))
+    except FutureTimeout:
+        # Still queued behind other jobs: drop it. A running job stops at its CPU deadline.
+        future.cancel()
+        raise SolverTimeout
+
+
+def submit_job(fn, *args, deadline=DEADLINE, **kwargs):
+    now = time.monotonic()
+    with _lock:
+        for job_id in [j for j, (f, created) in jobs.items() if f.done() and now - created > JOB_TTL]:
+            del jobs[job_id]
+        if len(jobs) >= MAX_JOBS:
+            counters["rejected"] += 1
+            raise SolverBusy
+    future = submit(fn, *args, deadline=deadline, **kwargs)
+    job_id = uuid.uuid4().hex
+    with _lock:
+        jobs[job_id] = (future, now)
+    return job_id
+
+
+def stats():
+    with _lock:
+        return dict(counters, queue_depth=_pending, workers=MAX_WORKERS, max_pending=MAX_PENDING, jobs=len(jobs))
+
+
+@solver_jobs.route('/solver/jobs/<job_id>')
+def job_status(job_id):
+    with _lock:
+        job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    future = job[0]
+    if not future.done():
+        return jsonify({"status": "running" if future.running() else "queued"})
+    if future.cancelled():
+        return jsonify({"status": "cancelled"})
+    error = future.exception()
+    if isinstance(error, SolverTimeout):
+        return jsonify({"status": "timeout"})
+    if error is not None:
+        return jsonify({"status": "error", "error": str(error)})
+    return jsonify({"status": "done", "result": pickle.loads(future.result())})
+
+
+@solver_jobs.route('/solver/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    with _lock:
+        job = jobs.pop(job_id, None)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify({"cancelled": job[0].cancel()})
+
+
+@solver_jobs.route('/solver/stats')
+def solver_stats():
+    return jsonify(stats())
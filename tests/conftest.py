@@ -0,0 +1,15 @@
+import os, sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import create_app
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
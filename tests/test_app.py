@@ -0,0 +1,21 @@
+import os
+import main
+
+
+def test_create_app_registers_every_blueprint(app):
+    assert set(app.blueprints) == {blueprint for module, blueprint in main.BLUEPRINTS}
+    report = app.extensions["arcade_startup"]
+    assert set(report["imports"]) == set(main.SHARED_IMPORTS) | {module for module, blueprint in main.BLUEPRINTS}
+
+
+def test_startup_reports_warm_up():
+    app = main.create_app()
+    client = app.test_client()
+    report = client.get("/startup").get_json()
+    assert report["warm_up"] == {} and report["warmed_in_pid"] is None and not report["preloaded"]
+    main.warm_up(app)
+    report = client.get("/startup").get_json()
+    assert report["warmed_in_pid"] == report["pid"] == os.getpid()
+    # Warmed in this process, not inherited from a preloading master.
+    assert not report["preloaded"]
+    assert all(ms >= 0 for ms in report["warm_up"].values())
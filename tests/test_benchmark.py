@@ -0,0 +1,21 @@
+import benchmark
+
+FAST = ["tic_tac_toe.best_move", "crypt_arithmetic.solve", "word_evolver.generations[100x20]",
+        "personality_evaluator.table_lookup"]
+
+
+def test_quick_benchmarks_are_deterministic(monkeypatch):
+    monkeypatch.setattr(benchmark, "MIN_TOTAL", 1e-9)
+    first = {name: benchmark.measure(benchmark.BENCHMARKS[name], True, False) for name in FAST}
+    second = {name: benchmark.measure(benchmark.BENCHMARKS[name], True, True) for name in FAST}
+    assert first["crypt_arithmetic.solve"]["nodes"] > 0 and "peak_kib" in second["crypt_arithmetic.solve"]
+    # A generous threshold so only the deterministic fields can regress.
+    assert benchmark.compare(second, first, threshold=100) == []
+
+
+def test_compare_flags_regressions():
+    base = {"a": {"wall_s": 1.0, "nodes": 10, "peak_kib": 100.0}, "b": {"wall_s": 1.0}}
+    assert benchmark.compare({"a": {"wall_s": 1.2, "nodes": 10, "peak_kib": 110.0}, "new": {"wall_s": 9.0}},
+                             base, 0.25) == []
+    regressions = benchmark.compare({"a": {"wall_s": 1.5, "nodes": 11, "peak_kib": 200.0}}, base, 0.25)
+    assert [line.split(":")[1].split()[0] for line in regressions] == ["wall", "peak", "nodes"]
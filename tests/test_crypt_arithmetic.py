@@ -0,0 +1,46 @@
+import crypt_arithmetic
+from crypt_arithmetic import MAX_SOLUTIONS, solution_cache, solve_words
+from crypt_arithmetic.solution_cache import canonicalize
+
+
+def test_all_mode_is_capped_and_not_cached(client):
+    r = client.post('/crypt-arithmetic/check-custom', json={"equation": "ABCDEF=ABCDEF", "mode": "all"})
+    assert r.status_code == 200
+    assert r.json["count"] == len(r.json["solutions"]) == MAX_SOLUTIONS
+    assert r.json["truncated"] is True
+    key, reverse = canonicalize("ABCDEF=ABCDEF")
+    assert solution_cache.get(key, crypt_arithmetic.LIMITS["all"]) is None
+
+
+def test_all_mode_complete_list(client):
+    r = client.post('/crypt-arithmetic/check-custom', json={"equation": "SEND+MORE=MONEY", "mode": "all"})
+    assert r.json["count"] == 1
+    assert r.json["truncated"] is False
+
+
+def test_job_results_are_capped():
+    result = solve_words("ABCDEF=ABCDEF", crypt_arithmetic.LIMITS["all"])
+    assert result["count"] == MAX_SOLUTIONS and result["truncated"]
+
+
+def test_column_and_vectorized_engines_agree():
+    from crypt_arithmetic import solver, vectorized
+    for equation in ("SEND+MORE=MONEY", "TO+GO=OUT", "AB+CD=EFGH", "ABC+ABC=ABC"):
+        products = vectorized.parse_equation(equation)
+        columns = solver.solve_terms([(ws[0], sign) for sign, ws in products], None)
+        assert sorted(map(sorted, (s.items() for s in columns))) == \
+            sorted(map(sorted, (s.items() for s in vectorized.solve_vectorized(products, None))))
+
+
+def test_complete_lists_answer_smaller_limits():
+    all_solutions = crypt_arithmetic.solve_equation_cached("TWO+TWO=FOUR", crypt_arithmetic.LIMITS["all"])
+    assert len(all_solutions) == 7
+    for mode in ("first", "unique"):
+        stats = {}
+        solutions = crypt_arithmetic.solve_equation_cached("TWO+TWO=FOUR", crypt_arithmetic.LIMITS[mode], stats)
+        assert stats.get("cached") and solutions == all_solutions[:crypt_arithmetic.LIMITS[mode]]
+    # A full first-mode answer stays under its own limit: it says nothing about other solutions.
+    crypt_arithmetic.solve_equation_cached("SEND+MOST=MONEY", 1)
+    stats = {}
+    crypt_arithmetic.solve_equation_cached("SEND+MOST=MONEY", 2, stats)
+    assert not stats.get("cached")
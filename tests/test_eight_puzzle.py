@@ -0,0 +1,106 @@
+import random
+import pytest
+import eight_puzzle
+from eight_puzzle import sliding
+
+
+@pytest.fixture
+def player(client):
+    with client.session_transaction() as session:
+        session["player_id"] = "test-player"
+    yield client
+    eight_puzzle.games.delete("test-player")
+
+
+@pytest.fixture
+def solves(monkeypatch):
+    # Every pool solve runs out of time, as 5x5 solves often do.
+    calls = []
+
+    def solve_board(state, width, max_depth=None):
+        calls.append(state)
+        return None, {"complete": False}
+    monkeypatch.setattr(eight_puzzle, "solve_board", solve_board)
+    return calls
+
+
+def put_game(state, width, plan, score=50):
+    eight_puzzle.games.put("test-player", {"width": width, "state": state, "plan": plan, "step": 0, "score": score})
+
+
+def one_move_apart(a, b):
+    return sum(x != y for x, y in zip(a, b)) == 2 and 0 in [x for x, y in zip(a, b) if x != y]
+
+
+def test_hints_without_a_plan_do_not_solve_again(player, solves):
+    state = sliding.scramble(5, 20)
+    put_game(state, 5, None)
+    for _ in range(3):
+        hinted = player.get("/8-puzzle/hint").get_json()["state"]
+        assert one_move_apart(state, hinted)
+        state = hinted
+    assert solves == []
+    # The player's own move changes the board, and that is solved once.
+    tile = sliding.neighbors(state, 5)[0][1]
+    assert player.post("/8-puzzle/move", json={"tile": tile}).get_json()["valid"]
+    assert len(solves) == 1
+
+
+def test_hint_at_the_goal_is_done(player, solves):
+    put_game(sliding.goal(4), 4, None)
+    assert player.get("/8-puzzle/hint").get_json() == {"done": True}
+    assert solves == []
+
+
+def tile_towards(state, following):
+    return following[state.index(0)]
+
+
+def stored_game():
+    return eight_puzzle.games.get("test-player")
+
+
+def move(client, state, following):
+    return client.post("/8-puzzle/move", json={"tile": tile_towards(state, following)}).get_json()
+
+
+def test_moves_are_graded_against_the_plan(player):
+    state = [1, 2, 3, 4, 5, 6, 0, 7, 8]
+    for t in (4, 5):
+        state = next(n for n, tile in eight_puzzle.get_neighbors(state) if tile == t)
+    plan = eight_puzzle.optimal_path(state)
+    put_game(state, 3, plan)
+
+    result = move(player, state, plan[0])
+    assert (result["correct"], result["score"], stored_game()["plan"]) == (True, 55, plan[1:])
+    state = plan[0]
+
+    wrong = next(n for n, tile in eight_puzzle.get_neighbors(state) if n != plan[1])
+    result = move(player, state, wrong)
+    assert (result["correct"], result["score"]) == (False, 50)
+    # The stored plan now starts by undoing the deviation.
+    assert stored_game()["plan"] == [state] + plan[1:]
+    assert move(player, wrong, state)["correct"]
+
+
+def test_a_missing_plan_is_solved_on_the_next_move(player):
+    state = sliding.scramble(4, 12, random.Random(7))
+    path = sliding.ida_star(state, 4, None, None)
+    put_game(state, 4, None)
+    result = move(player, state, path[0])
+    assert result["correct"] and result["state"] == path[0]
+    assert len(stored_game()["plan"]) == len(path) - 1
+
+
+def test_a_missing_plan_that_cannot_be_solved_is_graded_by_heuristic(player, solves):
+    state = sliding.scramble(5, 30, random.Random(5))
+    put_game(state, 5, None)
+    following = sliding.neighbors(state, 5)[0][0]
+    result = move(player, state, following)
+    assert result["correct"] == (sliding.heuristic(following, 5) < sliding.heuristic(state, 5))
+    assert len(solves) == 1 and stored_game()["plan"] is None
+
+
+@pytest.mark.parametrize("body", [{"size": "big"}, {"size": None}, {"size": [4]}, {"size": 6}, [4]])
+def test_shuffle_rejects_bad_sizes(player, body):
+    assert player.post("/8-puzzle/shuffle", json=body).status_code == 400
@@ -0,0 +1,92 @@
+import random, sqlite3
+import pytest
+import crypt_arithmetic, eight_puzzle, game_state
+
+
+def walk(width, steps, rng):
+    # A plan as the puzzle stores one: successive boards, each one blank move from the last.
+    state = list(range(1, width * width)) + [0]
+    plan = [state]
+    for _ in range(steps):
+        blank = state.index(0)
+        row, col = divmod(blank, width)
+        options = [blank + d for d, ok in ((-width, row > 0), (width, row < width - 1), (-1, col > 0), (1, col < width - 1)) if ok]
+        nidx = rng.choice(options)
+        state = state.copy()
+        state[blank], state[nidx] = state[nidx], 0
+        plan.append(state)
+    return plan
+
+
+@pytest.mark.parametrize("width", [3, 4, 5])
+def test_eight_puzzle_games_round_trip(width):
+    rng = random.Random(width)
+    plan = walk(width, 30, rng)
+    for game_plan, step in ((None, 0), ([], 0), (plan, 0), (plan, 12), (plan, len(plan))):
+        game = {"width": width, "state": plan[5], "plan": game_plan, "step": step, "score": 70000 + step}
+        decoded = eight_puzzle.decode_game(eight_puzzle.encode_game(game))
+        # The played part of the plan is dropped, so the decoded game starts at step 0.
+        expected = None if game_plan is None else game_plan[step:]
+        assert decoded == dict(game, plan=expected, step=0)
+
+
+def test_crypt_games_round_trip():
+    index = {difficulty: i for i, difficulty in enumerate(crypt_arithmetic.PUZZLES)}
+    game = {"index": index, "puzzle": None}
+    assert crypt_arithmetic.decode_game(crypt_arithmetic.encode_game(game)) == game
+    solution = dict(zip("DEMNORSY", (7, 5, 1, 6, 0, 8, 9, 2)))
+    for entries in ({}, {"M": 1, "O": 0}, dict(solution)):
+        game = {"index": index, "puzzle": {"word1": "SEND", "word2": "MORE", "result": "MONEY",
+                                           "solution": solution, "user_entries": entries}}
+        assert crypt_arithmetic.decode_game(crypt_arithmetic.encode_game(game)) == game
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    codec = (str.encode, bytes.decode)
+    if request.param == "memory":
+        return game_state.MemoryStateStore("test", *codec, ttl=60)
+    return game_state.SqliteStateStore("test", *codec, path=str(tmp_path / "state.db"), ttl=60)
+
+
+def test_store_get_put_delete(store):
+    assert store.get("a") is None
+    store.put("a", "first")
+    store.put("b", "second")
+    assert (store.get("a"), store.get("b")) == ("first", "second")
+    store.put("a", "third")
+    store.delete("b")
+    assert (store.get("a"), store.get("b")) == ("third", None)
+    stats = store.stats()
+    assert stats["entries"] == 1 and stats["hits"] == 3 and stats["misses"] == 2
+
+
+def test_sqlite_read_extends_ttl(tmp_path, monkeypatch):
+    path = str(tmp_path / "state.db")
+    store = game_state.SqliteStateStore("test", str.encode, bytes.decode, path=path, ttl=100)
+    clock = [1000.0]
+    monkeypatch.setattr(game_state.time, "time", lambda: clock[0])
+    store.put("a", "state")
+    clock[0] = 1090.0
+    assert store.get("a") == "state"
+    [(expires,)] = sqlite3.connect(path).execute("SELECT expires FROM game_state").fetchall()
+    assert expires == 1190.0
+    # Past the TTL of the put, but within the TTL the read renewed.
+    clock[0] = 1150.0
+    assert store.get("a") == "state"
+    clock[0] = 1300.0
+    assert store.get("a") is None
+
+
+def test_players_have_separate_games(app):
+    first, second = app.test_client(), app.test_client()
+    board = first.post("/8-puzzle/shuffle", json={"size": 4}).get_json()["state"]
+    assert len(board) == 16
+    second.post("/8-puzzle/shuffle", json={"size": 3})
+    with first.session_transaction() as session:
+        one = session["player_id"]
+    with second.session_transaction() as session:
+        two = session["player_id"]
+    assert one != two
+    assert eight_puzzle.games.get(one)["state"] == board
+    assert eight_puzzle.games.get(two)["width"] == 3
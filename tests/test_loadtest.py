@@ -0,0 +1,18 @@
+import loadtest
+
+
+def test_percentile_is_nearest_rank():
+    ordered = list(range(1, 101))
+    assert [loadtest.percentile(ordered, p) for p in (0, 50, 95, 99, 100)] == [1, 50, 95, 99, 100]
+    assert loadtest.percentile([7], 99) == 7
+
+
+def test_scenarios_run_without_errors():
+    server, base_url = loadtest.serve_locally()
+    try:
+        level = loadtest.run_level(base_url, list(loadtest.SCENARIOS), 2, 1.0, 0)
+    finally:
+        server.shutdown()
+    assert level["sessions"] >= 2 and level["requests"] > 0 and level["errors"] == 0
+    for r in level["routes"].values():
+        assert r["count"] > 0 and r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"] <= r["max_ms"]
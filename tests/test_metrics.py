@@ -0,0 +1,55 @@
+import time
+import pytest
+from flask import Response
+import metrics
+
+
+@pytest.fixture
+def metrics_client(monkeypatch):
+    from main import create_app
+    monkeypatch.setattr(metrics, "ENABLED", True)
+    metrics.reset()
+    app = create_app()
+
+    @app.route("/test-stream")
+    def stream():
+        def body():
+            yield "a"
+            time.sleep(0.2)
+            yield "b"
+        return Response(body())
+
+    # buffered makes the test client close each response, as a WSGI server does once the body is sent.
+    client = app.test_client()
+    client.get = lambda *args, **kwargs: client.open(*args, method="GET", buffered=True, **kwargs)
+    yield client
+    metrics.reset()
+
+
+def sample(text, line_start):
+    return next(float(line.rsplit(" ", 1)[1]) for line in text.splitlines() if line.startswith(line_start))
+
+
+def test_metrics_counts_requests(metrics_client):
+    metrics_client.get("/")
+    text = metrics_client.get("/metrics").get_data(as_text=True)
+    assert 'arcade_requests_total{method="GET",route="/",status="200"} 1' in text
+    assert "# TYPE arcade_request_duration_seconds histogram" in text
+
+
+def test_metrics_is_loopback_only(metrics_client):
+    assert metrics_client.get("/metrics", environ_base={"REMOTE_ADDR": "10.0.0.1"}).status_code == 404
+
+
+def test_streamed_body_is_timed(metrics_client):
+    assert metrics_client.get("/test-stream").get_data(as_text=True) == "ab"
+    text = metrics_client.get("/metrics").get_data(as_text=True)
+    assert sample(text, 'arcade_request_duration_seconds_sum{method="GET",route="/test-stream"}') >= 0.2
+
+
+def test_metrics_exports_solver_pool(metrics_client):
+    text = metrics_client.get("/metrics").get_data(as_text=True)
+    assert "# TYPE arcade_solver_pool_queue_depth gauge" in text
+    assert sample(text, "arcade_solver_pool_queue_depth ") >= 0
+    for event in metrics.POOL_EVENTS:
+        assert f'arcade_solver_pool_jobs_total{{event="{event}"}}' in text
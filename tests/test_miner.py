@@ -0,0 +1,37 @@
+import random, sqlite3, sys
+from crypt_arithmetic import miner
+from crypt_arithmetic.catalogue import Catalogue
+
+WORDS = ["TO", "GO", "OUT", "SEND", "MORE", "MONEY", "BE", "ME", "SHE", "IT", "IS", "FUN"]
+
+
+def mine(tmp_path, monkeypatch, *extra):
+    words = tmp_path / "words.txt"
+    words.write_text("\n".join(WORDS))
+    output = tmp_path / "catalogue.db"
+    monkeypatch.setattr(sys, "argv", ["miner", str(words), "-o", str(output), "--workers", "1", *extra])
+    miner.main()
+    return output
+
+
+def test_reservoir_is_uniform_sized_and_seeded():
+    sample = miner.reservoir(iter(range(1000)), 10, random.Random(1))
+    assert len(sample) == 10 and len(set(sample)) == 10
+    assert sample == miner.reservoir(iter(range(1000)), 10, random.Random(1))
+    assert miner.reservoir(iter(range(3)), 10, random.Random(1)) == [0, 1, 2]
+
+
+def test_rerun_skips_tried_candidates(tmp_path, monkeypatch, capsys):
+    output = mine(tmp_path, monkeypatch)
+    capsys.readouterr()
+    with sqlite3.connect(str(output) + ".work") as db:
+        tried = db.execute("SELECT COUNT(*) FROM tried").fetchone()[0]
+    assert tried == len(list(miner.candidates(sorted(WORDS))))
+    mine(tmp_path, monkeypatch)
+    assert " 0 new candidates" in capsys.readouterr().out
+    assert Catalogue(str(output)).stats()["available"]
+
+
+def test_sample_mode_caps_candidates(tmp_path, monkeypatch, capsys):
+    mine(tmp_path, monkeypatch, "--sample", "--max-candidates", "5")
+    assert " 5 new candidates" in capsys.readouterr().out
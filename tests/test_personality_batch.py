@@ -0,0 +1,50 @@
+import io, json
+import pytest
+from personality_evaluator.model import ANSWER_COUNT, answer_matrix
+from personality_evaluator.score import INVALID, MALFORMED, Writer, read_rows
+
+
+def test_answer_matrix_rejects_missing_and_non_finite_answers():
+    assert answer_matrix([[1] * ANSWER_COUNT, [0.5] * ANSWER_COUNT, [2] * ANSWER_COUNT]).shape == (3, ANSWER_COUNT)
+    for bad in (None, float("nan"), float("inf")):
+        with pytest.raises(ValueError, match="Row 1"):
+            answer_matrix([[0] * ANSWER_COUNT, [bad] + [0] * (ANSWER_COUNT - 1)])
+    with pytest.raises(ValueError, match="numbers"):
+        answer_matrix([["x"] * ANSWER_COUNT])
+
+
+def test_predict_batch_rejects_none(client):
+    rows = [[1] * ANSWER_COUNT, [None] * ANSWER_COUNT]
+    response = client.post("/personality-evaluator/predict-batch", json={"answers": rows})
+    assert response.status_code == 400
+    assert "Row 1" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("body", ["null", "[]", '{"answers": 5}', "not json"])
+def test_predict_batch_rejects_bodies_that_are_not_objects(client, body):
+    response = client.post("/personality-evaluator/predict-batch", data=body, content_type="application/json")
+    assert response.status_code == 400
+
+
+def test_predict_scores_off_scale_answers_with_the_model(client):
+    # Off the table's 0/1 domain, so these fall back to the model rather than being rejected.
+    for value in (2, 0.5, 1.0):
+        response = client.post("/personality-evaluator/predict", json={"answers": [value] * ANSWER_COUNT})
+        assert response.status_code == 200 and len(response.get_json()["mbti"]) == 4
+    response = client.post("/personality-evaluator/predict", json={"answers": [None] * ANSWER_COUNT})
+    assert response.status_code == 400
+
+
+def test_malformed_jsonl_lines_become_error_rows():
+    lines = [json.dumps({"id": 1, "answers": [1] * ANSWER_COUNT}), "{not json", "[1, 2]",
+             json.dumps({"id": 2, "answers": [None] * ANSWER_COUNT}), json.dumps({"id": 3, "answers": [0] * ANSWER_COUNT})]
+    rows = list(read_rows(io.StringIO("\n".join(lines) + "\n"), "jsonl"))
+    assert [answers is not None for record, answers in rows] == [True, False, False, False, True]
+    assert rows[1][0] == {"line": 2, "error": MALFORMED} and rows[2][0]["line"] == 3
+
+    out = io.StringIO()
+    writer = Writer(out, "jsonl")
+    for record, answers in rows[1:4]:
+        writer.write(record, None)
+    errors = [json.loads(line)["error"] for line in out.getvalue().splitlines()]
+    assert errors == [MALFORMED, MALFORMED, INVALID]
@@ -0,0 +1,55 @@
+import json
+import numpy as np
+import pytest
+from personality_evaluator import FALLBACK_RECOMMENDATION, recommendations
+from personality_evaluator.model import ANSWERS_PER_TRAIT, ANSWER_COUNT, TraitModel, answer_matrix, score_rows
+from personality_evaluator.response_table import ResponseTable
+
+pytest.importorskip("sklearn")
+export_model = pytest.importorskip("personality_evaluator.export_model")
+
+
+@pytest.fixture(scope="module")
+def pickles():
+    return export_model.load_pickles()
+
+
+@pytest.fixture(scope="module")
+def fused(pickles, tmp_path_factory):
+    return export_model.export(pickles, str(tmp_path_factory.mktemp("model") / "model.npz"))
+
+
+def sample_answers(count, seed=0):
+    return np.random.default_rng(seed).integers(0, 2, (count, ANSWER_COUNT))
+
+
+def test_export_check_passes(pickles, fused):
+    rows, max_diff = export_model.check_equivalence(pickles, fused)
+    assert rows > 0 and max_diff < 1e-9
+
+
+def test_fused_model_matches_the_pickles(pickles, fused):
+    answers = sample_answers(20000)
+    labels, confidence = fused.predict(answers)
+    for i, model in enumerate(pickles):
+        x = answers[:, i * ANSWERS_PER_TRAIT:(i + 1) * ANSWERS_PER_TRAIT]
+        expected = model.predict(x)
+        assert np.array_equal(labels[:, i], expected)
+        np.testing.assert_allclose(confidence[:, i], model.predict_proba(x)[np.arange(len(x)), expected], atol=1e-12)
+
+
+def test_served_artifact_matches_the_pickles(pickles):
+    served = TraitModel.load()
+    answers = sample_answers(5000, seed=1)
+    labels, _ = served.predict(answers)
+    for i, model in enumerate(pickles):
+        assert np.array_equal(labels[:, i], model.predict(answers[:, i * ANSWERS_PER_TRAIT:(i + 1) * ANSWERS_PER_TRAIT]))
+
+
+def test_response_table_matches_the_model(fused):
+    table = ResponseTable(fused, recommendations, FALLBACK_RECOMMENDATION)
+    rows = sample_answers(20000, seed=2).tolist()
+    for row, (mbti, confidence) in zip(rows, score_rows(fused, answer_matrix(rows))):
+        body = json.loads(table.lookup(row))
+        assert body["mbti"] == mbti and body["confidence"] == confidence
+        assert body["careers"] == recommendations.get(mbti, FALLBACK_RECOMMENDATION)["careers"]
@@ -0,0 +1,89 @@
+import random
+import pytest
+from eight_puzzle import sliding
+
+
+def distances(width, depth):
+    # Exact distances to the goal for every board at most depth moves away, by breadth-first search.
+    start = tuple(sliding.goal(width))
+    dist, frontier, adj = {start: 0}, [start], sliding.adjacent(width)
+    for d in range(1, depth + 1):
+        following = []
+        for state in frontier:
+            blank = state.index(0)
+            for nidx in adj[blank]:
+                child = list(state)
+                child[blank], child[nidx] = child[nidx], 0
+                child = tuple(child)
+                if child not in dist:
+                    dist[child] = d
+                    following.append(child)
+        frontier = following
+    return dist
+
+
+@pytest.fixture(scope="module")
+def known_4x4():
+    return distances(4, 14)
+
+
+def test_ida_star_paths_are_optimal(known_4x4):
+    rng = random.Random(4)
+    deepest = [s for s, d in known_4x4.items() if d == 14]
+    for state in rng.sample(deepest, 10) + rng.sample(list(known_4x4), 20):
+        stats = {}
+        path = sliding.ida_star(list(state), 4, None, None, stats)
+        assert stats["complete"] and len(path) == known_4x4[state]
+        previous = list(state)
+        for board in path:
+            assert board in [n for n, tile in sliding.neighbors(previous, 4)]
+            previous = board
+        assert previous == sliding.goal(4)
+
+
+def test_max_depth_proves_no_shorter_path(known_4x4):
+    state = next(s for s, d in known_4x4.items() if d == 12)
+    stats = {}
+    assert sliding.ida_star(list(state), 4, None, None, stats, max_depth=11) is None
+    assert stats["complete"]
+
+
+def test_heuristic_is_admissible(known_4x4):
+    for state, d in random.Random(0).sample(sorted(known_4x4.items()), 5000):
+        assert sliding.heuristic(list(state), 4) <= d
+    assert sliding.heuristic(sliding.goal(4), 4) == 0
+
+
+@pytest.mark.parametrize("width", [4, 5])
+def test_incremental_heuristic_matches_a_fresh_one(width):
+    # slide() keeps Manhattan distance, linear conflicts and the additive pattern databases up to date.
+    rng = random.Random(width)
+    search = sliding._Search(sliding.goal(width), width, None, None)
+    for _ in range(300):
+        search.slide(rng.choice(search.adj[search.pos[0]]))
+        fresh = sliding._Search(search.board, width, None, None)
+        assert (search.md, search.lc, search.pdb_h) == (fresh.md, fresh.lc, fresh.pdb_h)
+
+
+def test_pattern_databases_add_up():
+    if sliding.pattern_databases(4) is None:
+        pytest.skip("4x4 pattern databases not built")
+    search = sliding._Search(sliding.goal(4), 4, None, None)
+    assert search.pdb_h == 0 and sorted(search.group_of) == list(range(1, 16))
+
+
+@pytest.mark.parametrize("width", [4, 5])
+def test_solvability(width):
+    rng = random.Random(width)
+    for _ in range(20):
+        state = sliding.scramble(width, 60, rng)
+        assert sliding.is_solvable(state, width)
+        # Swapping two tiles flips the parity, whichever row the blank is in.
+        a, b = [i for i, t in enumerate(state) if t][:2]
+        swapped = state.copy()
+        swapped[a], swapped[b] = swapped[b], swapped[a]
+        assert not sliding.is_solvable(swapped, width)
+    # 15 and 14 exchanged: Sam Loyd's unsolvable 4x4 puzzle.
+    loyd = sliding.goal(4)
+    loyd[13], loyd[14] = loyd[14], loyd[13]
+    assert not sliding.is_solvable(loyd, 4)
@@ -0,0 +1,39 @@
+import time
+import pytest
+import solver_pool
+
+
+def spin(seconds):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+    return "done"
+
+
+def big(size):
+    return b"x" * size
+
+
+def test_result_round_trips():
+    assert solver_pool.run(spin, 0.01, deadline=2.0) == "done"
+
+
+def test_run_gives_up_at_the_deadline():
+    start = time.perf_counter()
+    with pytest.raises(solver_pool.SolverTimeout):
+        solver_pool.run(spin, 5.0, deadline=0.5)
+    assert time.perf_counter() - start < 0.5 + 0.25
+
+
+def test_oversized_results_fail_in_the_pool():
+    with pytest.raises(solver_pool.SolverResultTooLarge):
+        solver_pool.run(big, solver_pool.MAX_RESULT_BYTES + 1, deadline=2.0)
+
+
+def test_counters_are_reported():
+    before = solver_pool.stats()["completed"]
+    solver_pool.run(spin, 0.01, deadline=2.0)
+    time.sleep(0.05)
+    stats = solver_pool.stats()
+    assert stats["completed"] == before + 1
+    assert {"timeouts", "rejected", "queue_depth"} <= stats.keys()
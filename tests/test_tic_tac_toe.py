@@ -0,0 +1,159 @@
+import random, time
+import pytest
+from tic_tac_toe import engine, is_draw, is_winner, lookup_move
+from tic_tac_toe.engine import Engine, from_cells, get_engine
+
+
+def test_zero_time_limit_keeps_the_budget(client):
+    start = time.perf_counter()
+    r = client.post('/tic-tac-toe/ai-move', json={"board": [' '] * 25, "size": 5, "k": 4, "time_limit": 0})
+    assert r.status_code == 200
+    assert r.json["move"] is not None
+    assert time.perf_counter() - start < 2.0
+
+
+def test_budget_treats_zero_as_a_deadline():
+    result = Engine(5, 4).search(0, 0, 'O', time_limit=0)
+    assert result["move"] is not None
+    assert result["elapsed"] < 1.0
+
+
+@pytest.mark.parametrize("body", [
+    {"board": [' '] * 9, "time_limit": "soon"},
+    {"difficulty": "hard"},
+    {"board": [' '] * 100, "size": 10},
+    {"board": [' '] * 900, "size": 30},
+    {"board": ['Z'] + [' '] * 8},
+    {"board": "         "},
+])
+def test_bad_requests_are_rejected(client, body):
+    assert client.post('/tic-tac-toe/ai-move', json=body).status_code == 400
+
+
+def test_engine_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(engine, "_engines", engine.OrderedDict())
+    for size in (3, 4, 5):
+        for k in range(3, size + 1):
+            get_engine(size, k)
+    assert len(engine._engines) == engine.MAX_ENGINES
+    assert (5, 5) in engine._engines
+
+
+def distinct_boards(count, size=5):
+    rng = random.Random(0)
+    boards = set()
+    while len(boards) < count:
+        cells = rng.sample(range(size * size), 3)
+        board = [' '] * (size * size)
+        board[cells[0]] = board[cells[1]] = 'X'
+        board[cells[2]] = 'O'
+        boards.add(''.join(board))
+    return [list(b) for b in sorted(boards)]
+
+
+def test_batch_respects_the_total_deadline(client, monkeypatch):
+    import tic_tac_toe
+    monkeypatch.setattr(tic_tac_toe, "BATCH_TIME_LIMIT", 0.5)
+    items = [{"board": b, "size": 5, "k": 4} for b in distinct_boards(200)]
+    start = time.perf_counter()
+    r = client.post('/tic-tac-toe/ai-moves', json={"items": items, "time_limit": 0})
+    assert r.status_code == 200
+    assert time.perf_counter() - start < 2.0
+    assert r.json["count"] == 200
+    assert all(m is not None and items[i]["board"][m] == ' ' for i, m in enumerate(r.json["moves"]))
+
+
+@pytest.mark.parametrize("body", ["null", "[1, 2]", '"items"', '{"items": 5}', '{"items": {"board": []}}', "not json"])
+def test_batch_rejects_bodies_that_are_not_objects(client, body):
+    r = client.post('/tic-tac-toe/ai-moves', data=body, content_type='application/json')
+    assert r.status_code == 400
+
+
+def test_batch_rejects_bad_time_limit(client):
+    r = client.post('/tic-tac-toe/ai-moves', json={"items": [{"board": [' '] * 9}], "time_limit": "x"})
+    assert r.status_code == 400
+
+
+def minimax_value(board, player):
+    # The original hard-mode search, kept as the reference: O-relative, 1 win, 0 draw, -1 loss.
+    other = 'X' if player == 'O' else 'O'
+    scores = []
+    for i, cell in enumerate(board):
+        if cell == ' ':
+            board[i] = player
+            if is_winner(board, player):
+                scores.append(1 if player == 'O' else -1)
+            elif is_draw(board):
+                scores.append(0)
+            else:
+                scores.append(minimax_value(board, other))
+            board[i] = ' '
+    return max(scores) if player == 'O' else min(scores)
+
+
+def reference_move(board):
+    # Lowest-index move with the best value, as the original best_move chose.
+    best, move = None, None
+    for i, cell in enumerate(board):
+        if cell == ' ':
+            board[i] = 'O'
+            score = 1 if is_winner(board, 'O') else 0 if is_draw(board) else minimax_value(board, 'X')
+            board[i] = ' '
+            if best is None or score > best:
+                best, move = score, i
+    return move
+
+
+def o_to_move_positions():
+    seen = set()
+
+    def walk(board, player):
+        if is_winner(board, 'X') or is_winner(board, 'O') or is_draw(board) or (board, player) in seen:
+            return
+        seen.add((board, player))
+        for i, cell in enumerate(board):
+            if cell == ' ':
+                walk(board[:i] + player + board[i + 1:], 'X' if player == 'O' else 'O')
+    walk(' ' * 9, 'X')
+    walk(' ' * 9, 'O')
+    return sorted(board for board, player in seen if player == 'O')
+
+
+def test_solution_table_matches_the_original_hard_move():
+    for board in random.Random(1).sample(o_to_move_positions(), 300):
+        assert lookup_move(list(board)) == reference_move(list(board)), board
+
+
+@pytest.mark.parametrize("board, move", [
+    ("OO XX    ", 2),   # completes the top row
+    ("XX  O    ", 2),   # blocks X's top row
+    ("X   O   X", 1),   # a corner loses to a fork, so the lowest edge
+])
+def test_hard_moves_win_and_block(client, board, move):
+    r = client.post('/tic-tac-toe/ai-move', json={"board": list(board), "difficulty": "hard"})
+    assert r.json["move"] == move
+
+
+def test_engine_moves_are_optimal_on_3x3():
+    for board in random.Random(2).sample(o_to_move_positions(), 100):
+        x_bits, o_bits = from_cells(list(board))
+        move = Engine(3, 3).search(x_bits, o_bits, 'O')["move"]
+        cells = list(board)
+        cells[move] = 'O'
+        value = 1 if is_winner(cells, 'O') else 0 if is_draw(cells) else minimax_value(cells, 'X')
+        assert value == minimax_value(list(board), 'O'), board
+
+
+@pytest.mark.parametrize("size, k, x, o, move", [
+    (4, 3, [5, 6], [7, 12], 4),     # blocks X's row
+    (5, 4, [0, 6, 12], [1, 2, 3], 4),  # takes the win over blocking X's diagonal
+    (5, 4, [0, 6, 12], [1, 2, 20], 18),  # blocks X's diagonal
+])
+def test_engine_wins_and_blocks_on_larger_boards(size, k, x, o, move):
+    board = [' '] * (size * size)
+    for i in x:
+        board[i] = 'X'
+    for i in o:
+        board[i] = 'O'
+    result = Engine(size, k).search(*from_cells(board), 'O', time_limit=1.0)
+    assert result["move"] == move
@@ -0,0 +1,67 @@
+import numpy as np
+from word_evolver import ALPHABET, encode, decode, evolve_population, fitness_scores, generation_rng, random_population
+
+
+def evolve(seed, generations, size=50, target="HELLO WORLD"):
+    target_codes = encode([target])[0]
+    population, scores = random_population(generation_rng(seed, 0), size, len(target)), None
+    for generation in range(1, generations + 1):
+        population, scores = evolve_population(population, target_codes, {}, generation_rng(seed, generation), scores)
+    return population, scores
+
+
+def test_evolution_is_reproducible_and_scores_match():
+    population, scores = evolve(7, 20)
+    again, _ = evolve(7, 20)
+    assert np.array_equal(population, again)
+    assert np.array_equal(scores, fitness_scores(population, encode(["HELLO WORLD"])[0]))
+    assert set(decode(population[0])) <= set(ALPHABET.tobytes().decode())
+
+
+def test_start_validates_input(client):
+    from word_evolver import MAX_TARGET_LENGTH
+    assert client.post('/start', json={"target": "A" * (MAX_TARGET_LENGTH + 1)}).status_code == 400
+    assert client.post('/start', json={"target": "HI", "seed": -1}).status_code == 400
+    assert client.post('/start', json={"target": "HI", "seed": "x"}).status_code == 400
+    assert client.post('/start', json={"target": "HI", "population_size": 20001}).status_code == 400
+    assert client.post('/start', json={"target": "A" * MAX_TARGET_LENGTH, "seed": 3}).status_code == 200
+
+
+def test_runs_survive_between_requests(client):
+    client.post('/start', json={"target": "HELLO", "seed": 1})
+    first = client.get('/next-generation').json
+    second = client.get('/next-generation?since=0').json
+    assert (first["generation"], second["generation"]) == (1, 2)
+    assert [e["generation"] for e in second["history"]] == [1, 2]
+    assert client.post('/reset').status_code == 200
+    assert client.get('/next-generation').status_code == 400
+
+
+def test_sqlite_run_store_round_trips(tmp_path):
+    from word_evolver.run_store import SqliteRunStore, new_run
+    store = SqliteRunStore(str(tmp_path / "runs.db"))
+    run = new_run("HI", 5, b"ABCD")
+    run["history"].append({"generation": 1, "best": "HA", "fitness": 1})
+    store.put("r1", run)
+    loaded = store.get("r1")
+    assert loaded["population"] == b"ABCD" and list(loaded["history"]) == list(run["history"])
+    store.delete("r1")
+    assert store.get("r1") is None
+
+
+def test_largest_seed_fits_the_sqlite_store(client, tmp_path, monkeypatch):
+    import word_evolver
+    from word_evolver.run_store import SqliteRunStore
+    # The seed is stored as an SQLite INTEGER, which is signed 64-bit.
+    monkeypatch.setattr(word_evolver, "runs", SqliteRunStore(str(tmp_path / "runs.db")))
+    assert client.post('/start', json={"target": "HI", "seed": word_evolver.MAX_SEED}).status_code == 400
+    assert client.post('/start', json={"target": "HI", "seed": word_evolver.MAX_SEED - 1}).status_code == 200
+    assert client.get('/next-generation').json["generation"] == 1
+
+
+def test_debug_log_sample_is_clamped(client):
+    from word_evolver import LOG_LIMIT
+    client.post('/start', json={"target": "A" * 200, "seed": 2, "population_size": 2000})
+    for sample, most in ((-1, 0), (10 ** 6, LOG_LIMIT)):
+        calculations = client.get(f'/next-generation?debug=1&sample={sample}').json["calculations"]
+        assert len(calculations["mutation_log"]) <= most and len(calculations["crossover_log"]) <= most
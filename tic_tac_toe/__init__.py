@@ -1,8 +1,18 @@
-from flask import Blueprint, request, jsonify, render_template
-import math, random
+from flask import Blueprint, request, jsonify, render_template, current_app
+import random, time
+import metrics
+from .engine import get_engine, from_cells
 
 tic_tac_toe = Blueprint('tic_tac_toe', __name__, template_folder='templates')
 
+TIME_LIMIT = 0.5
+MIN_TIME_LIMIT = 0.01
+MAX_TIME_LIMIT = 2.0
+MAX_SIZE = 5
+CELLS = (' ', 'X', 'O')
+MAX_BATCH_SIZE = 1000
+BATCH_TIME_LIMIT = 5.0
+
 def is_winner(board, player):
     wins = [
         [0,1,2],[3,4,5],[6,7,8],
@@ -17,38 +27,77 @@ def is_draw(board):
 def get_available_moves(board):
     return [i for i, val in enumerate(board) if val == ' ']
 
-def minimax(board, is_max, alpha, beta):
-    if is_winner(board, 'O'):
-        return 1
-    if is_winner(board, 'X'):
-        return -1
-    if is_draw(board):
-        return 0
-
-    if is_max:
-        best = -math.inf
-        for i in get_available_moves(board):
-            board[i] = 'O'
-            score = minimax(board, False, alpha, beta)
-            board[i] = ' '
-            best = max(best, score)
-            alpha = max(alpha, best)
-            if beta <= alpha:
-                break
-        return best
-    else:
-        best = math.inf
-        for i in get_available_moves(board):
-            board[i] = 'X'
-            score = minimax(board, True, alpha, beta)
-            board[i] = ' '
-            best = min(best, score)
-            beta = min(beta, best)
-            if beta <= alpha:
-                break
-        return best
-
-def best_move(board, difficulty):
+# The 8 symmetries of the square as index permutations: transformed[j] = board[perm[j]].
+ROTATE = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+MIRROR = (2, 1, 0, 5, 4, 3, 8, 7, 6)
+
+def _compose(p, q):
+    return tuple(p[q[j]] for j in range(9))
+
+def _build_symmetries():
+    perms = [tuple(range(9))]
+    for _ in range(3):
+        perms.append(_compose(perms[-1], ROTATE))
+    perms += [_compose(p, MIRROR) for p in perms]
+    return perms
+
+SYMMETRIES = _build_symmetries()
+
+def canonical(board):
+    return min((''.join(board[i] for i in perm), perm) for perm in SYMMETRIES)
+
+def _solve(board, player, table):
+    key = (board, player)
+    if key in table:
+        return table[key][0]
+    other = 'X' if player == 'O' else 'O'
+    scores = {}
+    for i in get_available_moves(board):
+        child = board[:i] + player + board[i + 1:]
+        if is_winner(child, player):
+            scores[i] = 1 if player == 'O' else -1
+        elif is_draw(child):
+            scores[i] = 0
+        else:
+            scores[i] = _solve(canonical(child)[0], other, table)
+    best = max(scores.values()) if player == 'O' else min(scores.values())
+    table[key] = (best, tuple(i for i, s in scores.items() if s == best))
+    return best
+
+def build_solution_table():
+    # Keyed by (canonical board, player to move); values are O-relative scores and the
+    # optimal moves in canonical coordinates. Both X-first and O-first games are covered.
+    table = {}
+    for player in 'XO':
+        _solve(' ' * 9, player, table)
+    return table
+
+_solution_table = None
+
+def solution_table():
+    global _solution_table
+    if _solution_table is None:
+        _solution_table = build_solution_table()
+    return _solution_table
+
+def warm_up():
+    solution_table()
+
+def lookup_move(board):
+    key, perm = canonical(''.join(board))
+    entry = solution_table().get((key, 'O'))
+    if entry is None:
+        return None
+    return min(perm[i] for i in entry[1])
+
+def search_move(board, size=3, k=3, time_limit=TIME_LIMIT, max_nodes=None):
+    x_bits, o_bits = from_cells(board)
+    result = get_engine(size, k).search(x_bits, o_bits, 'O', time_limit, max_nodes)
+    if result:
+        metrics.record_solver('minimax', result, result['elapsed'])
+    return result
+
+def best_move(board, difficulty, size=3, k=3, time_limit=TIME_LIMIT):
     available = get_available_moves(board)
 
     if difficulty == "easy":
@@ -58,25 +107,103 @@ def best_move(board, difficulty):
         if random.random() < 0.5:
             return random.choice(available)
 
-    best_score = -math.inf
-    move = None
-    for i in available:
-        board[i] = 'O'
-        score = minimax(board, False, alpha=-math.inf, beta=math.inf)
-        board[i] = ' '
-        if score > best_score:
-            best_score = score
-            move = i
-    return move
+    if size == 3 and k == 3:
+        move = lookup_move(board)
+        if move is not None:
+            return move
+
+    result = search_move(board, size, k, time_limit)
+    return result["move"] if result else None
 
 @tic_tac_toe.route('/tic-tac-toe')
 def game():
     return render_template('tictactoe.html')
 
+def best_moves(items, time_limit=TIME_LIMIT):
+    # Random picks stay per item; the deterministic moves are computed once per distinct position.
+    # Searches share one BATCH_TIME_LIMIT deadline: positions still unsearched when it passes get
+    # a random move and are counted in the second return value.
+    deadline = time.perf_counter() + BATCH_TIME_LIMIT
+    positions = {}
+    for board, difficulty, size, k in items:
+        if difficulty != 'easy':
+            positions.setdefault((''.join(board), size, k), board)
+    searched = {key for key in positions if key[1:] != (3, 3) or lookup_move(positions[key]) is None}
+    per_search = min(time_limit, BATCH_TIME_LIMIT / max(1, len(searched)))
+    solved, unsearched = {}, 0
+    for key, board in positions.items():
+        remaining = deadline - time.perf_counter()
+        if key in searched and remaining <= 0:
+            unsearched += 1
+            continue
+        solved[key] = best_move(board, 'hard', key[1], key[2], min(per_search, remaining))
+
+    moves = []
+    for board, difficulty, size, k in items:
+        available = get_available_moves(board)
+        key = (''.join(board), size, k)
+        if not available:
+            moves.append(None)
+        elif difficulty == 'easy' or (difficulty == 'medium' and random.random() < 0.5) or key not in solved:
+            moves.append(random.choice(available))
+        else:
+            moves.append(solved[key])
+    return moves, len(positions), unsearched
+
+def parse_item(data):
+    board = data['board']
+    size = int(data.get('size', 3))
+    k = int(data.get('k', size if size <= 3 else 4))
+    if not 3 <= size <= MAX_SIZE:
+        raise ValueError(f'Size must be between 3 and {MAX_SIZE}')
+    if not isinstance(board, list) or not 3 <= k <= size or len(board) != size * size:
+        raise ValueError('Board must be size x size cells with 3 <= k <= size')
+    if any(cell not in CELLS for cell in board):
+        raise ValueError("Cells must be ' ', 'X' or 'O'")
+    return board, data.get('difficulty', 'hard'), size, k
+
+def parse_time_limit(data):
+    # A zero or negative limit would switch the search budget off, so it is clamped from below too.
+    return max(MIN_TIME_LIMIT, min(float(data.get('time_limit', TIME_LIMIT)), MAX_TIME_LIMIT))
+
 @tic_tac_toe.route('/tic-tac-toe/ai-move', methods=['POST'])
 def ai_move():
     data = request.json
-    board = data['board']
-    difficulty = data.get('difficulty', 'hard')
-    move = best_move(board, difficulty)
+    try:
+        board, difficulty, size, k = parse_item(data)
+        time_limit = parse_time_limit(data)
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid request: {e}'}), 400
+    move = best_move(board, difficulty, size, k, time_limit)
     return jsonify({'move': move})
+
+@tic_tac_toe.route('/tic-tac-toe/ai-moves', methods=['POST'])
+def ai_moves():
+    start = time.perf_counter()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('items', []), list):
+        return jsonify({'error': 'Body must be an object with an items list'}), 400
+    raw_items = data.get('items', [])
+    max_batch = current_app.config.get('TIC_TAC_TOE_MAX_BATCH', MAX_BATCH_SIZE)
+    if len(raw_items) > max_batch:
+        return jsonify({'error': f'Batch size {len(raw_items)} exceeds the limit of {max_batch}'}), 413
+
+    items = []
+    for i, item in enumerate(raw_items):
+        try:
+            items.append(parse_item(item))
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Item {i}: {e}'}), 400
+    try:
+        time_limit = parse_time_limit(data)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid time_limit: {e}'}), 400
+
+    moves, unique, unsearched = best_moves(items, time_limit)
+    return jsonify({
+        'moves': moves,
+        'count': len(moves),
+        'unique': unique,
+        'unsearched': unsearched,
+        'elapsed_ms': round((time.perf_counter() - start) * 1000, 3)
+    })
@@ -0,0 +1,204 @@
+import time
+from collections import OrderedDict
+
+# N×N, k-in-a-row search on integer bitboards: bit i is cell i (row-major), one int per player.
+
+WIN_SCORE = 1000000
+EXACT, LOWER, UPPER = 0, 1, 2
+TT_LIMIT = 500000
+CHECK_EVERY = 1024
+MAX_ENGINES = 4
+
+
+class SearchBudgetExceeded(Exception):
+    pass
+
+
+def win_masks(size, k):
+    masks = []
+    for r in range(size):
+        for c in range(size):
+            for dr, dc in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                if 0 <= end_r < size and 0 <= end_c < size:
+                    mask = 0
+                    for step in range(k):
+                        mask |= 1 << ((r + dr * step) * size + c + dc * step)
+                    masks.append(mask)
+    return masks
+
+
+def from_cells(board):
+    x_bits = o_bits = 0
+    for i, val in enumerate(board):
+        if val == 'X':
+            x_bits |= 1 << i
+        elif val == 'O':
+            o_bits |= 1 << i
+    return x_bits, o_bits
+
+
+class _Budget:
+    def __init__(self, time_limit, max_nodes):
+        self.nodes = 0
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.max_nodes = max_nodes
+
+    def tick(self):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            if self.max_nodes and self.nodes >= self.max_nodes:
+                raise SearchBudgetExceeded
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SearchBudgetExceeded
+
+
+class Engine:
+    def __init__(self, size=3, k=3):
+        if not 1 <= k <= size:
+            raise ValueError("k must be between 1 and the board size")
+        self.size, self.k = size, k
+        self.cells = size * size
+        self.full = (1 << self.cells) - 1
+        self.masks = win_masks(size, k)
+        self.masks_through = [[m for m in self.masks if m >> i & 1] for i in range(self.cells)]
+        centre = (size - 1) / 2
+        self.order = sorted(range(self.cells),
+                            key=lambda i: abs(i // size - centre) + abs(i % size - centre))
+        self.near = []
+        for i in range(self.cells):
+            r, c = divmod(i, size)
+            mask = 0
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    if 0 <= r + dr < size and 0 <= c + dc < size:
+                        mask |= 1 << ((r + dr) * size + c + dc)
+            self.near.append(mask)
+        # Restricting candidates to cells next to existing stones only pays off on larger boards.
+        self.prune_far = size >= 5
+        self.history = [0] * self.cells
+        self.table = {}
+
+    def is_win(self, bits, cell):
+        return any(bits & m == m for m in self.masks_through[cell])
+
+    def evaluate(self, me, opp):
+        score = 0
+        for m in self.masks:
+            if not m & opp:
+                score += 10 ** (m & me).bit_count() - 1
+            elif not m & me:
+                score -= 10 ** (m & opp).bit_count() - 1
+        return score
+
+    def candidates(self, me, opp, tt_move):
+        occupied = me | opp
+        empty = self.full & ~occupied
+        if self.prune_far and occupied:
+            area = 0
+            bits = occupied
+            while bits:
+                low = bits & -bits
+                area |= self.near[low.bit_length() - 1]
+                bits ^= low
+            empty &= area
+        moves = [i for i in self.order if empty >> i & 1]
+        moves.sort(key=lambda i: -self.history[i])
+        if tt_move is not None and tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+        return moves
+
+    def negamax(self, me, opp, depth, alpha, beta, budget):
+        budget.tick()
+        occupied = me | opp
+        if occupied == self.full:
+            return 0
+        if depth == 0:
+            return self.evaluate(me, opp)
+
+        key = (me, opp)
+        entry = self.table.get(key)
+        tt_move = None
+        if entry:
+            e_depth, flag, value, tt_move = entry
+            if e_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        original_alpha = alpha
+        best, best_cell = -WIN_SCORE * 2, None
+        # Win scores shrink with the stone count so faster wins rank higher; being a
+        # function of the position keeps them valid across searches sharing the table.
+        win = WIN_SCORE - occupied.bit_count()
+        for cell in self.candidates(me, opp, tt_move):
+            bit = 1 << cell
+            if self.is_win(me | bit, cell):
+                score = win
+            else:
+                score = -self.negamax(opp, me | bit, depth - 1, -beta, -alpha, budget)
+            if score > best:
+                best, best_cell = score, cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self.history[cell] += depth * depth
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        if len(self.table) >= TT_LIMIT:
+            self.table.clear()
+        self.table[key] = (depth, flag, best, best_cell)
+        return best
+
+    def search(self, x_bits, o_bits, player, time_limit=None, max_nodes=None):
+        me, opp = (o_bits, x_bits) if player == 'O' else (x_bits, o_bits)
+        empties = (self.full & ~(me | opp)).bit_count()
+        if not empties:
+            return None
+        start = time.perf_counter()
+        budget = _Budget(time_limit, max_nodes)
+        move = self.candidates(me, opp, None)[0]
+        score, depth, complete = None, 0, False
+        for d in range(1, empties + 1):
+            try:
+                value = self.negamax(me, opp, d, -WIN_SCORE * 2, WIN_SCORE * 2, budget)
+            except SearchBudgetExceeded:
+                break
+            move, score, depth = self.table[(me, opp)][3], value, d
+            if d == empties or abs(value) >= WIN_SCORE - self.cells:
+                complete = True
+                break
+        return {
+            "move": move,
+            "score": score,
+            "depth": depth,
+            "complete": complete,
+            "nodes": budget.nodes,
+            "elapsed": time.perf_counter() - start,
+        }
+
+
+# Engines keep their transposition tables between searches; the least recently used one is
+# dropped once MAX_ENGINES board shapes are cached.
+_engines = OrderedDict()
+
+
+def get_engine(size, k):
+    key = (size, k)
+    if key not in _engines:
+        _engines[key] = Engine(size, k)
+        while len(_engines) > MAX_ENGINES:
+            _engines.popitem(last=False)
+    _engines.move_to_end(key)
+    return _engines[key]
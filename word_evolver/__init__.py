@@ -1,60 +1,124 @@
-from flask import Blueprint, request, jsonify, render_template, session
-import random, string
+from flask import Blueprint, Response, request, jsonify, render_template, session, stream_with_context
+import json, random, string, time, uuid
+import numpy as np
+import metrics
+from .run_store import make_store, new_run
 
 word_evolver = Blueprint('word_evolver', __name__, template_folder='templates')
 
+# Individuals are rows of a uint8 matrix of ASCII codes. Each generation scores the whole
+# population once against the target by broadcasting; selection, crossover and mutation are
+# array operations drawn from a numpy Generator seeded by (run seed, generation).
+
 POPULATION_SIZE = 100
 MUTATION_RATE = 0.01
+ELITE = 10
+TOURNAMENT_SIZE = 5
+LOG_LIMIT = 100
+DEBUG_SAMPLE = 5
+MAX_POPULATION = 20000
+MAX_TARGET_LENGTH = 200
+MAX_SEED = 2 ** 63
+MAX_STEPS = 5000
+CHECKPOINT_EVERY = 25
+ALPHABET = np.frombuffer((string.ascii_uppercase + ' ').encode(), dtype=np.uint8)
+
+runs = make_store()
+
+
+def encode(strings):
+    return np.frombuffer(''.join(strings).encode('ascii', 'replace'), dtype=np.uint8).reshape(len(strings), -1).copy()
+
+
+def decode(row):
+    return row.tobytes().decode('ascii')
+
+
+def generation_rng(seed, generation):
+    return np.random.default_rng([seed, generation])
+
+
+def random_population(rng, size, length):
+    return ALPHABET[rng.integers(0, len(ALPHABET), (size, length))]
+
+
+def fitness_scores(population, target_codes):
+    return np.count_nonzero(population == target_codes, axis=1)
+
+
+def tournament_selection(scores, rng, count, k=TOURNAMENT_SIZE):
+    entrants = rng.integers(0, len(scores), (count, k))
+    return entrants[np.arange(count), np.argmax(scores[entrants], axis=1)]
+
+
+def crossover(parents1, parents2, rng):
+    splits = rng.integers(0, parents1.shape[1], len(parents1))
+    return np.where(np.arange(parents1.shape[1]) < splits[:, None], parents1, parents2)
+
 
-def random_char():
-    return random.choice(string.ascii_uppercase + ' ')
-
-def random_individual(length):
-    return ''.join(random_char() for _ in range(length))
-
-def fitness(individual, target):
-    return sum(1 for a, b in zip(individual, target) if a == b)
-
-def mutate(individual, mutation_log):
-    result = []
-    for c in individual:
-        if random.random() < MUTATION_RATE:
-            new_char = random_char()
-            mutation_log.append((c, new_char))
-            result.append(new_char)
-        else:
-            result.append(c)
-    return ''.join(result)
-
-def crossover(parent1, parent2, crossover_log):
-    split = random.randint(0, len(parent1) - 1)
-    child = parent1[:split] + parent2[split:]
-    crossover_log.append((parent1, parent2, child))
-    return child
-
-def evolve_population(population, target, debug_info):
-    sorted_population = sorted(population, key=lambda x: fitness(x, target), reverse=True)
-    new_generation = sorted_population[:10]
-    crossover_log = []
-    mutation_log = []
-    fitness_calls = 0
-
-    while len(new_generation) < POPULATION_SIZE:
-        parent1 = tournament_selection(sorted_population, target)
-        parent2 = tournament_selection(sorted_population, target)
-        child = crossover(parent1, parent2, crossover_log)
-        before_mutation = child
-        child = mutate(child, mutation_log)
-        new_generation.append(child)
-        fitness_calls += 1
-
-    debug_info['crossover_log'] = crossover_log
-    debug_info['mutation_log'] = mutation_log
-    debug_info['fitness_calls'] = fitness_calls + len(population)
-    return new_generation
-
-def tournament_selection(population, target, k=5):
-    return max(random.sample(population, k), key=lambda x: fitness(x, target))
+def mutate(children, rng, rate=MUTATION_RATE):
+    mutated = children.copy()
+    mask = rng.random(children.shape) < rate
+    mutated[mask] = ALPHABET[rng.integers(0, len(ALPHABET), np.count_nonzero(mask))]
+    return mutated, mask
+
+
+def evolve_population(population, target_codes, debug_info, rng, scores=None, log_limit=LOG_LIMIT):
+    # Returns the next generation and its scores; pass the scores back in on the next call.
+    if scores is None:
+        scores = fitness_scores(population, target_codes)
+    elite = population[np.argsort(-scores, kind='stable')[:ELITE]]
+    count = len(population) - len(elite)
+    parents1 = population[tournament_selection(scores, rng, count)]
+    parents2 = population[tournament_selection(scores, rng, count)]
+    crossed = crossover(parents1, parents2, rng)
+    children, mask = mutate(crossed, rng)
+    new_generation = np.vstack([elite, children])
+    new_scores = fitness_scores(new_generation, target_codes)
+
+    # Logs are decoded for the first log_limit children and mutations only.
+    shown = min(count, log_limit)
+    debug_info['crossover_log'] = [(decode(parents1[i]), decode(parents2[i]), decode(crossed[i]))
+                                   for i in range(shown)]
+    rows, cols = np.nonzero(mask)
+    debug_info['mutation_log'] = [(chr(crossed[r, c]), chr(children[r, c]))
+                                  for r, c in zip(rows[:log_limit], cols[:log_limit])]
+    debug_info['fitness_calls'] = len(new_generation)
+    return new_generation, new_scores
+
+
+def evolve_run(run, log_limit=0):
+    # Advances a stored run one generation per iteration, yielding its history entry and logs.
+    target_codes = encode([run['target']])[0]
+    population = np.frombuffer(run['population'], dtype=np.uint8).reshape(-1, len(target_codes))
+    scores = None
+    while True:
+        generation = run['generation'] + 1
+        debug_info = {}
+        rng = generation_rng(run['seed'], generation)
+        population, scores = evolve_population(population, target_codes, debug_info, rng, scores, log_limit)
+        metrics.count("arcade_ga_generations_total")
+        metrics.count("arcade_ga_fitness_evaluations_total", debug_info['fitness_calls'])
+        best_index = int(np.argmax(scores))
+        entry = {"generation": generation, "best": decode(population[best_index]), "fitness": int(scores[best_index])}
+        run['history'].append(entry)
+        run['population'] = population.tobytes()
+        run['generation'] = generation
+        yield entry, debug_info
+
+
+def log_sample():
+    # ?sample=N, clamped to [0, LOG_LIMIT]: a negative slice bound would return nearly the whole log.
+    return max(0, min(request.args.get('sample', DEBUG_SAMPLE, type=int), LOG_LIMIT))
+
+
+def calculations(debug_info, target):
+    return {
+        "crossover_log": debug_info['crossover_log'],
+        "mutation_log": debug_info['mutation_log'],
+        "fitnessCalls": debug_info['fitness_calls'],
+        "formula": f"Fitness = Number of matching characters between candidate and target (\"{target}\")"
+    }
 
 @word_evolver.route('/word-evolver')
 def home():
@@ -66,55 +130,116 @@ def start():
     target = data.get("target", "").upper().strip()
     if not target:
         return jsonify({"error": "Target sentence required."}), 400
-
-    session['target'] = target
-    session['population'] = [random_individual(len(target)) for _ in range(POPULATION_SIZE)]
-    session['generation'] = 0
-    session['history'] = []
-    return jsonify({"message": "Target set.", "length": len(target)})
+    if len(target) > MAX_TARGET_LENGTH:
+        return jsonify({"error": f"Target must be at most {MAX_TARGET_LENGTH} characters."}), 400
+    try:
+        size = int(data.get("population_size", POPULATION_SIZE))
+        seed = int(data.get("seed", random.getrandbits(32)))
+    except (TypeError, ValueError):
+        return jsonify({"error": "population_size and seed must be integers."}), 400
+    if not ELITE < size <= MAX_POPULATION:
+        return jsonify({"error": f"population_size must be between {ELITE + 1} and {MAX_POPULATION}."}), 400
+    if not 0 <= seed < MAX_SEED:
+        return jsonify({"error": "seed must be a non-negative signed 64-bit integer."}), 400
+
+    population = random_population(generation_rng(seed, 0), size, len(target))
+    if 'run_id' in session:
+        runs.delete(session['run_id'])
+    session['run_id'] = uuid.uuid4().hex
+    runs.put(session['run_id'], new_run(target, seed, population.tobytes()))
+    return jsonify({"message": "Target set.", "length": len(target), "seed": seed, "population_size": size})
+
+def current_run():
+    return runs.get(session['run_id']) if 'run_id' in session else None
 
 @word_evolver.route('/next-generation')
 def next_generation():
-    if 'target' not in session:
+    run = current_run()
+    if run is None:
         return jsonify({"error": "No target set. Please start first."}), 400
 
-    target = session['target']
-    population = session['population']
-    generation = session['generation']
-    history = session['history']
-
-    generation += 1
-    debug_info = {}
-    population = evolve_population(population, target, debug_info)
-    best = max(population, key=lambda x: fitness(x, target))
-    fit = fitness(best, target)
-    done = best == target
-
-    explanation = f"Generation {generation}: Best string \"{best}\" has {fit}/{len(target)} matching characters."
-    formula = f"Fitness = Number of matching characters between candidate and target (\"{target}\")"
+    since = request.args.get('since', run['generation'], type=int)
+    debug = request.args.get('debug', 0, type=int)
+    sample = log_sample()
+    target = run['target']
+    entry, debug_info = next(evolve_run(run, sample if debug else 0))
+    runs.put(session['run_id'], run)
 
-    history.append({"generation": generation, "best": best, "fitness": fit})
-
-    session['population'] = population
-    session['generation'] = generation
-    session['history'] = history
-
-    return jsonify({
+    generation, best, fit = entry['generation'], entry['best'], entry['fitness']
+    response = {
         "generation": generation,
         "best": best,
         "fitness": fit,
-        "done": done,
-        "history": history,
-        "explanation": explanation,
-        "calculations": {
-            "crossover_log": debug_info['crossover_log'],
-            "mutation_log": debug_info['mutation_log'],
-            "fitnessCalls": debug_info['fitness_calls'],
-            "formula": formula
-        }
-    })
+        "done": best == target,
+        "history": [e for e in run['history'] if e['generation'] > since],
+        "explanation": f"Generation {generation}: Best string \"{best}\" has {fit}/{len(target)} matching characters."
+    }
+    if debug:
+        response["calculations"] = calculations(debug_info, target)
+    return jsonify(response)
+
+@word_evolver.route('/word-evolver/run')
+def run_generations():
+    # Runs up to ?generations=N server-side and streams one compact line per generation, as
+    # newline-delimited JSON or, with ?format=sse, as Server-Sent Events. ?patience=K stops after
+    # K generations without improvement; ?debug_every=K attaches sampled logs every K generations.
+    run = current_run()
+    if run is None:
+        return jsonify({"error": "No target set. Please start first."}), 400
+    generations = request.args.get('generations', 100, type=int)
+    patience = request.args.get('patience', 0, type=int)
+    debug_every = request.args.get('debug_every', 0, type=int)
+    sample = log_sample()
+    sse = request.args.get('format') == 'sse'
+    if not 0 < generations <= MAX_STEPS:
+        return jsonify({"error": f"generations must be between 1 and {MAX_STEPS}."}), 400
+    run_id = session['run_id']
+
+    def frame(payload, event=None):
+        line = json.dumps(payload, separators=(',', ':'))
+        if not sse:
+            return line + '\n'
+        return (f"event: {event}\n" if event else "") + f"data: {line}\n\n"
+
+    def stream():
+        start = time.perf_counter()
+        target = run['target']
+        best_fit, stalled, reason, steps = -1, 0, "limit", 0
+        evolution = evolve_run(run, sample if debug_every else 0)
+        try:
+            for steps in range(1, generations + 1):
+                entry, debug_info = next(evolution)
+                done = entry['best'] == target
+                progress = dict(entry, done=done)
+                if debug_every and steps % debug_every == 0:
+                    progress["calculations"] = calculations(debug_info, target)
+                yield frame(progress)
+                if steps % CHECKPOINT_EVERY == 0:
+                    runs.put(run_id, run)
+                stalled = 0 if entry['fitness'] > best_fit else stalled + 1
+                best_fit = max(best_fit, entry['fitness'])
+                if done:
+                    reason = "done"
+                    break
+                if patience and stalled >= patience:
+                    reason = "stalled"
+                    break
+            yield frame({"finished": True, "reason": reason, "generations": steps,
+                         "generation": run['generation'],
+                         "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)}, event="end")
+        finally:
+            runs.put(run_id, run)
+
+    mimetype = 'text/event-stream' if sse else 'application/x-ndjson'
+    return Response(stream_with_context(stream()), mimetype=mimetype, headers={"Cache-Control": "no-cache"})
 
 @word_evolver.route('/reset', methods=['POST'])
 def reset():
-    session.clear()
+    run_id = session.pop('run_id', None)
+    if run_id:
+        runs.delete(run_id)
     return jsonify({"message": "Reset complete."})
+
+@word_evolver.route('/word-evolver/store-stats')
+def store_stats():
+    return jsonify(runs.stats())
@@ -0,0 +1,159 @@
+import argparse, os, time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from . import ELITE, decode, encode, evolve_population, fitness_scores, generation_rng, random_population
+
+# Island-model evolution: python -m word_evolver.islands "TARGET SENTENCE" --islands 4
+# Each island is an independent sub-population evolved in a worker process for one migration
+# interval at a time. Between intervals the top migrants of every island replace the worst
+# individuals of its neighbours (ring) or of every other island (all). Island seeds are spawned
+# from one SeedSequence and each generation's Generator is seeded by (island seed, generation),
+# so a run is reproducible for a given seed whatever the worker count.
+
+TOPOLOGIES = ("ring", "all")
+
+
+def island_seeds(seed, islands):
+    return [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(islands)]
+
+
+def evolve_epoch(population, target, seed, start, generations):
+    # Worker entry point; populations travel as bytes. Stops early once the target appears.
+    target_codes = encode([target])[0]
+    population = np.frombuffer(population, dtype=np.uint8).reshape(-1, len(target))
+    scores = None
+    began = time.perf_counter()
+    ran = 0
+    for generation in range(start, start + generations):
+        population, scores = evolve_population(population, target_codes, {}, generation_rng(seed, generation),
+                                                scores, log_limit=0)
+        ran += 1
+        if scores.max() == len(target):
+            break
+    return population.tobytes(), ran, time.perf_counter() - began
+
+
+def destinations(island, islands, topology):
+    if topology == "ring":
+        return [(island + 1) % islands] if islands > 1 else []
+    return [other for other in range(islands) if other != island]
+
+
+def migrate(populations, target_codes, migrants, topology):
+    # Emigrants are chosen from every island before any island receives, so the order of
+    # islands does not matter.
+    ranked = [np.argsort(-fitness_scores(p, target_codes), kind='stable') for p in populations]
+    incoming = [[] for _ in populations]
+    for island, population in enumerate(populations):
+        for other in destinations(island, len(populations), topology):
+            incoming[other].append(population[ranked[island][:migrants]])
+    result = []
+    for island, population in enumerate(populations):
+        population = population.copy()
+        if incoming[island]:
+            arrivals = np.vstack(incoming[island])[:len(population) - ELITE]
+            population[ranked[island][len(population) - len(arrivals):]] = arrivals
+        result.append(population)
+    return result
+
+
+def run_islands(target, islands=4, population_size=250, interval=20, migrants=2, topology="ring",
+                max_generations=2000, seed=0, workers=None):
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"topology must be one of {list(TOPOLOGIES)}")
+    if population_size <= ELITE:
+        raise ValueError(f"population_size must be greater than {ELITE}")
+    target = target.upper()
+    target_codes = encode([target])[0]
+    seeds = island_seeds(seed, islands)
+    populations = [random_population(generation_rng(s, 0), population_size, len(target)) for s in seeds]
+    compute = [0.0] * islands
+    evolved = [0] * islands
+    generation = 0
+    migrations = 0
+    started = time.perf_counter()
+    executor = ProcessPoolExecutor(max_workers=workers or min(islands, os.cpu_count())) if islands > 1 else None
+    try:
+        while generation < max_generations:
+            steps = min(interval, max_generations - generation)
+            jobs = [(p.tobytes(), target, s, generation + 1, steps) for p, s in zip(populations, seeds)]
+            if executor:
+                results = list(executor.map(evolve_epoch, *zip(*jobs)))
+            else:
+                results = [evolve_epoch(*job) for job in jobs]
+            populations = [np.frombuffer(r[0], dtype=np.uint8).reshape(-1, len(target)) for r in results]
+            for island, (_, ran, elapsed) in enumerate(results):
+                compute[island] += elapsed
+                evolved[island] += ran
+            # Islands that hit the target stop early; the epoch counts as far as the first of them.
+            generation += min(r[1] for r in results)
+            if any(fitness_scores(p, target_codes).max() == len(target) for p in populations):
+                break
+            populations = migrate(populations, target_codes, migrants, topology)
+            migrations += 1
+    finally:
+        if executor:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    report = []
+    for island, population in enumerate(populations):
+        scores = fitness_scores(population, target_codes)
+        top = int(np.argmax(scores))
+        report.append({"island": island, "best": decode(population[top]), "fitness": int(scores[top]),
+                       "generations_per_sec": round(evolved[island] / compute[island], 1) if compute[island] else None})
+    winner = max(report, key=lambda r: r["fitness"])
+    return {"converged": winner["fitness"] == len(target), "generations": generation, "migrations": migrations,
+            "elapsed": round(elapsed, 3), "best": winner["best"], "fitness": winner["fitness"], "islands": report}
+
+
+def run_single(target, population_size, max_generations=2000, seed=0):
+    target = target.upper()
+    target_codes = encode([target])[0]
+    population = random_population(generation_rng(seed, 0), population_size, len(target))
+    scores = None
+    started = time.perf_counter()
+    generation = 0
+    while generation < max_generations:
+        generation += 1
+        population, scores = evolve_population(population, target_codes, {}, generation_rng(seed, generation),
+                                               scores, log_limit=0)
+        if scores.max() == len(target):
+            break
+    top = int(np.argmax(scores))
+    return {"converged": int(scores[top]) == len(target), "generations": generation,
+            "elapsed": round(time.perf_counter() - started, 3), "best": decode(population[top]),
+            "fitness": int(scores[top])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Island-model word evolution.")
+    parser.add_argument("target")
+    parser.add_argument("--islands", type=int, default=4)
+    parser.add_argument("--population", type=int, default=250, help="individuals per island")
+    parser.add_argument("--interval", type=int, default=20, help="generations between migrations")
+    parser.add_argument("--migrants", type=int, default=2)
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="ring")
+    parser.add_argument("--max-generations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--compare", action="store_true",
+                        help="also run one population of islands * population individuals")
+    args = parser.parse_args()
+
+    result = run_islands(args.target, args.islands, args.population, args.interval, args.migrants,
+                         args.topology, args.max_generations, args.seed, args.workers)
+    for island in result["islands"]:
+        print(f"island {island['island']}: fitness {island['fitness']}/{len(args.target)} "
+              f"{island['generations_per_sec']} gen/s  {island['best']}")
+    print(f"islands: converged={result['converged']} after {result['generations']} generations, "
+          f"{result['migrations']} migrations, {result['elapsed']}s")
+    if args.compare:
+        single = run_single(args.target, args.islands * args.population, args.max_generations, args.seed)
+        print(f"single:  converged={single['converged']} after {single['generations']} generations, "
+              f"{single['elapsed']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import json, os, sqlite3, threading, time
+from collections import OrderedDict, deque
+
+# Server-side state for word-evolver runs, keyed by a run id kept in the session. A run is a
+# dict with the target, seed, generation, the population packed as bytes (one row of ASCII
+# codes per individual) and the most recent HISTORY_LIMIT history entries.
+# WORD_EVOLVER_STORE=sqlite shares runs between worker processes through WORD_EVOLVER_DB.
+
+MAX_ENTRIES = 10000
+TTL = 3600
+HISTORY_LIMIT = 500
+DB_PATH = os.environ.get(
+    "WORD_EVOLVER_DB",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs.db"))
+
+
+def new_run(target, seed, population):
+    return {"target": target, "seed": seed, "generation": 0, "population": population,
+            "history": deque(maxlen=HISTORY_LIMIT)}
+
+
+class MemoryRunStore:
+    # LRU with a sliding TTL, as in game_state.MemoryStateStore.
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.evictions = self.expirations = 0
+
+    def get(self, run_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(run_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self.entries[run_id]
+                    self.expirations += 1
+                return None
+            self.entries[run_id] = (now + self.ttl, entry[1])
+            self.entries.move_to_end(run_id)
+            return entry[1]
+
+    def put(self, run_id, run):
+        now = time.monotonic()
+        with self.lock:
+            self.entries[run_id] = (now + self.ttl, run)
+            self.entries.move_to_end(run_id)
+            while self.entries:
+                oldest_id, (expires, _) = next(iter(self.entries.items()))
+                if expires <= now:
+                    self.expirations += 1
+                elif len(self.entries) > self.max_entries:
+                    self.evictions += 1
+                else:
+                    break
+                del self.entries[oldest_id]
+
+    def delete(self, run_id):
+        with self.lock:
+            self.entries.pop(run_id, None)
+
+    def stats(self):
+        with self.lock:
+            return {"backend": "memory", "runs": len(self.entries),
+                    "evictions": self.evictions, "expirations": self.expirations}
+
+
+class SqliteRunStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS runs (
+        run_id TEXT PRIMARY KEY, target TEXT, seed INTEGER, generation INTEGER,
+        population BLOB, history TEXT, expires REAL
+    );
+    CREATE INDEX IF NOT EXISTS runs_expires ON runs (expires);
+    """
+
+    def __init__(self, path=DB_PATH, ttl=TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.conn = None
+        self.pid = None
+        self.expirations = 0
+
+    def _connect(self):
+        # Opened lazily and per process: a connection must not cross a gunicorn fork.
+        if self.conn is None or self.pid != os.getpid():
+            self.conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(self.SCHEMA)
+            self.pid = os.getpid()
+        return self.conn
+
+    def get(self, run_id):
+        with self.lock:
+            row = self._connect().execute(
+                "SELECT target, seed, generation, population, history FROM runs WHERE run_id = ? AND expires > ?",
+                (run_id, time.time())).fetchone()
+        if row is None:
+            return None
+        target, seed, generation, population, history = row
+        return {"target": target, "seed": seed, "generation": generation, "population": population,
+                "history": deque(json.loads(history), maxlen=HISTORY_LIMIT)}
+
+    def put(self, run_id, run):
+        now = time.time()
+        with self.lock:
+            conn = self._connect()
+            conn.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (run_id, run["target"], run["seed"], run["generation"], run["population"],
+                          json.dumps(list(run["history"])), now + self.ttl))
+            self.expirations += conn.execute("DELETE FROM runs WHERE expires <= ?", (now,)).rowcount
+
+    def delete(self, run_id):
+        with self.lock:
+            self._connect().execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+
+    def stats(self):
+        with self.lock:
+            runs = self._connect().execute("SELECT COUNT(*) FROM runs WHERE expires > ?", (time.time(),)).fetchone()[0]
+        return {"backend": "sqlite", "runs": runs, "expirations": self.expirations}
+
+
+def make_store():
+    if os.environ.get("WORD_EVOLVER_STORE", "memory") == "sqlite":
+        return SqliteRunStore()
+    return MemoryRunStore()